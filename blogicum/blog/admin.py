@@ -1,6 +1,7 @@
 from django.contrib import admin
 
-from .models import Category, Location, Post, Comment
+from .models import Category, Location, Post, Comment, Task
+from .search import NO_LIMIT, search_post_ids
 
 
 class PostAdmin(admin.ModelAdmin):
@@ -10,8 +11,25 @@ class PostAdmin(admin.ModelAdmin):
     list_display = ('pub_date', 'author', 'location', 'category',
                     'is_published', 'created_at', 'title', 'text',)
 
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term:
+            return super().get_search_results(
+                request, queryset, search_term
+            )
+        return queryset.filter(pk__in=search_post_ids(
+            search_term, limit=NO_LIMIT
+        )), False
+
+
+class TaskAdmin(admin.ModelAdmin):
+    list_display = ('name', 'post', 'status', 'attempts', 'run_after',
+                    'updated_at')
+    list_filter = ('status', 'name')
+    readonly_fields = ('created_at', 'updated_at')
+
 
 admin.site.register(Category)
 admin.site.register(Location)
 admin.site.register(Post, PostAdmin)
 admin.site.register(Comment)
+admin.site.register(Task, TaskAdmin)
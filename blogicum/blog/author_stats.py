@@ -0,0 +1,206 @@
+from django.db import router, transaction
+from django.db.models import Count, F, Max, Min, Q, Sum, Value
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+
+from .caching import scheduler_resets_cache
+from .models import AuthorStats, Post, User
+
+STATS_FIELDS = (
+    'total_posts', 'published_posts', 'comments_received',
+    'last_post_date', 'next_pub_date',
+)
+
+
+def is_stale(stats, now=None):
+    """Отложенная публикация вышла, и опубликованные пора пересчитать.
+
+    С планировщиком статистику пересчитывает сигнал post_published.
+    """
+    if scheduler_resets_cache():
+        return False
+    return stats.next_pub_date is not None and (
+        stats.next_pub_date <= (now or timezone.now())
+    )
+
+
+def post_filters(now):
+    """Условия опубликованных и уже вышедших публикаций."""
+    published = Q(is_published=True, category__is_published=True)
+    return published, published & Q(pub_date__lte=now)
+
+
+def compute_stats(author_ids=None):
+    """Статистика по авторам: {author_id: {поле: значение}}."""
+    published, visible = post_filters(timezone.now())
+    # Результат записывается в основную базу, поэтому и читается из неё:
+    # отставание реплики иначе осталось бы в AuthorStats.
+    posts = Post.objects.using(router.db_for_write(Post))
+    if author_ids is not None:
+        posts = posts.filter(author_id__in=author_ids)
+    rows = posts.order_by().values('author_id').annotate(
+        total_posts=Count('pk'),
+        published_posts=Count('pk', filter=visible),
+        comments_received=Coalesce(
+            Sum('comment_count', filter=visible), 0
+        ),
+        last_post_date=Max('pub_date', filter=visible),
+        next_pub_date=Min('pub_date', filter=published & ~visible),
+    )
+    return {
+        row['author_id']: {field: row[field] for field in STATS_FIELDS}
+        for row in rows
+    }
+
+
+def empty_stats():
+    return {
+        'total_posts': 0,
+        'published_posts': 0,
+        'comments_received': 0,
+        'last_post_date': None,
+        'next_pub_date': None,
+    }
+
+
+def get_author_stats(author):
+    """Статистика автора; пересчитывается, если её нет или она устарела."""
+    stats = AuthorStats.objects.filter(author=author).first()
+    if stats is None or is_stale(stats):
+        values = compute_stats([author.pk]).get(author.pk, empty_stats())
+        stats, _ = AuthorStats.objects.update_or_create(
+            author=author, defaults=values
+        )
+    return stats
+
+
+def refresh_author_stats(author_ids):
+    """Пересчитывает строки статистики авторов, если они есть.
+
+    Строку создаёт сигнал при регистрации пользователя, поэтому при
+    каскадном удалении автора она не появляется заново.
+    """
+    author_ids = set(author_ids) - {None}
+    if not author_ids:
+        return
+    computed = compute_stats(author_ids)
+    for author_id in author_ids:
+        AuthorStats.objects.filter(author_id=author_id).update(
+            **computed.get(author_id, empty_stats())
+        )
+
+
+def post_state(post_id):
+    """Вклад публикации в статистику автора; None, если публикации нет."""
+    post = Post.objects.using(router.db_for_write(Post)).filter(
+        pk=post_id
+    ).values(
+        'author_id', 'is_published', 'pub_date', 'category__is_published',
+        'comment_count',
+    ).first()
+    if post is None:
+        return None
+    published = post['is_published'] and bool(post['category__is_published'])
+    visible = published and post['pub_date'] <= timezone.now()
+    return {
+        'author_id': post['author_id'],
+        'pub_date': post['pub_date'],
+        'visible': visible,
+        'scheduled': published and not visible,
+        'comments': post['comment_count'] if visible else 0,
+    }
+
+
+ABSENT_POST = {
+    'pub_date': None, 'visible': False, 'scheduled': False, 'comments': 0,
+}
+
+# Крайнюю дату нужно найти заново.
+RECOMPUTE = object()
+
+
+def moved_bound(bound, old, new, flag, pick):
+    """Крайняя дата (pick — max или min) после изменения публикации."""
+    if old[flag] and old['pub_date'] == bound:
+        if new[flag] and pick(new['pub_date'], bound) == new['pub_date']:
+            return new['pub_date']
+        return RECOMPUTE
+    if new[flag]:
+        return pick(filter(None, (bound, new['pub_date'])))
+    return bound
+
+
+def apply_post_change(old, new):
+    """Переносит в статистику автора изменение одной публикации.
+
+    old и new — post_state до и после изменения. Счётчики меняются на
+    разницу, а крайние даты ищутся заново, только если ушла прежняя.
+    """
+    if old and new and old['author_id'] != new['author_id']:
+        apply_post_change(old, None)
+        apply_post_change(None, new)
+        return
+    if not (old or new):
+        return
+    author_id = (new or old)['author_id']
+    stats = AuthorStats.objects.filter(author_id=author_id).first()
+    if stats is None:
+        return
+    now = timezone.now()
+    if stats.next_pub_date is not None and stats.next_pub_date <= now:
+        # С тех пор вышла отложенная публикация: разницей её не учесть.
+        refresh_author_stats([author_id])
+        return
+    changes = {'total_posts': bool(new) - bool(old)}
+    old, new = old or ABSENT_POST, new or ABSENT_POST
+    changes['published_posts'] = new['visible'] - old['visible']
+    changes['comments_received'] = new['comments'] - old['comments']
+    values = {
+        field: Greatest(F(field) + delta, Value(0))
+        for field, delta in changes.items() if delta
+    }
+    values['last_post_date'] = moved_bound(
+        stats.last_post_date, old, new, 'visible', max
+    )
+    values['next_pub_date'] = moved_bound(
+        stats.next_pub_date, old, new, 'scheduled', min
+    )
+    published, visible = post_filters(now)
+    posts = Post.objects.using(router.db_for_write(Post)).filter(
+        author_id=author_id
+    )
+    if values['last_post_date'] is RECOMPUTE:
+        values['last_post_date'] = posts.filter(visible).aggregate(
+            value=Max('pub_date')
+        )['value']
+    if values['next_pub_date'] is RECOMPUTE:
+        values['next_pub_date'] = posts.filter(
+            published & ~visible
+        ).aggregate(value=Min('pub_date'))['value']
+    AuthorStats.objects.filter(author_id=author_id).update(**values)
+
+
+def add_received_comments(author_id, delta):
+    AuthorStats.objects.filter(author_id=author_id).update(
+        comments_received=Greatest(
+            F('comments_received') + delta, Value(0)
+        )
+    )
+
+
+@transaction.atomic
+def rebuild_author_stats():
+    computed = compute_stats()
+    author_ids = list(User.objects.values_list('pk', flat=True))
+    AuthorStats.objects.all().delete()
+    AuthorStats.objects.bulk_create(
+        (
+            AuthorStats(
+                author_id=author_id,
+                **computed.get(author_id, empty_stats()),
+            )
+            for author_id in author_ids
+        ),
+        batch_size=1000,
+    )
+    return len(author_ids)
@@ -0,0 +1,325 @@
+import hashlib
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.exceptions import EmptyResultSet
+from django.db.models import Min, Subquery
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+COUNT_GENERATION_KEY = 'blog:count:generation'
+
+
+def feed_scope():
+    return 'feed'
+
+
+def category_scope(category_id):
+    return f'category:{category_id}'
+
+
+def post_scope(post_id):
+    return f'post:{post_id}'
+
+
+def location_scope(location_id):
+    return f'location:{location_id}'
+
+
+def user_scope(user_id):
+    return f'user:{user_id}'
+
+
+def category_page_scope(category_slug):
+    return f'category-page:{category_slug}'
+
+
+def profile_page_scope(username):
+    return f'profile-page:{username}'
+
+
+def pages_scope():
+    return 'pages'
+
+
+def lookups_scope():
+    return 'lookups'
+
+
+def cache_is_shared():
+    """Видят ли другие процессы версии, поднятые в этом процессе."""
+    return not isinstance(caches['default'], (DummyCache, LocMemCache))
+
+
+def scheduler_resets_cache():
+    """Сбрасывает ли кеш при выходе отложенных публикаций планировщик.
+
+    Его сброс виден сайту только через общий для процессов кеш, поэтому
+    с кешем процесса срок кеша по-прежнему ограничивается pub_date.
+    """
+    return settings.PUBLICATION_SCHEDULER and cache_is_shared()
+
+
+def _version_key(scope):
+    return f'blog:version:{scope}'
+
+
+def _bumped_key(scope):
+    return f'blog:bumped:{scope}'
+
+
+def clock():
+    return time.time()
+
+
+def _initial_version():
+    # После вытеснения ключа версия не должна совпасть с одной из прежних.
+    return int(time.time() * 1000)
+
+
+def get_versions(*scopes):
+    keys = [_version_key(scope) for scope in scopes]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, _initial_version(), None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def bump_versions(*scopes):
+    for scope in scopes:
+        key = _version_key(scope)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, _initial_version(), None)
+    now = clock()
+    cache.set_many({_bumped_key(scope): now for scope in scopes}, None)
+
+
+def bumped_at(*scopes):
+    """Время последнего подъёма версии любой из областей.
+
+    Для областей, о подъёме которых кеш не знает, это время первого
+    вопроса о них.
+    """
+    keys = [_bumped_key(scope) for scope in scopes]
+    times = cache.get_many(keys)
+    now = clock()
+    for key in keys:
+        if key not in times:
+            cache.add(key, now, None)
+            times[key] = cache.get(key, now)
+    return max(times.values())
+
+
+def post_card_cache_key(post):
+    versions = get_versions(
+        post_scope(post.pk),
+        category_scope(post.category_id),
+        location_scope(post.location_id),
+        user_scope(post.author_id),
+    )
+    version = '.'.join(str(value) for value in versions)
+    return f'blog:post_card:{post.pk}:{version}:{post.comment_count}'
+
+
+def page_cache_timeout(scheduled_posts=None):
+    timeout = settings.PAGE_CACHE_TIMEOUT
+    if scheduled_posts is None or scheduler_resets_cache():
+        return timeout
+    now = timezone.now()
+    next_pub_date = scheduled_posts.filter(
+        is_published=True, pub_date__gt=now
+    ).aggregate(next_pub_date=Min('pub_date'))['next_pub_date']
+    if next_pub_date is not None:
+        seconds = (next_pub_date - now).total_seconds()
+        timeout = min(timeout, max(int(seconds), 1))
+    return timeout
+
+
+def cache_anonymous_page(get_scopes, get_scheduled_posts=None):
+    """Кеширует страницу целиком для анонимных посетителей.
+
+    get_scopes по аргументам представления возвращает области, версии
+    которых входят в ключ кеша. get_scheduled_posts возвращает публикации,
+    появление которых по pub_date должно сбросить страницу.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if (request.method not in ('GET', 'HEAD')
+                    or request.user.is_authenticated):
+                return view(request, *args, **kwargs)
+            versions = get_versions(pages_scope(), *get_scopes(**kwargs))
+            path_hash = hashlib.md5(
+                request.get_full_path().encode()
+            ).hexdigest()
+            key = 'blog:page:{}:{}'.format(
+                path_hash, '.'.join(str(value) for value in versions)
+            )
+            response = cache.get(key)
+            if response is None:
+                response = view(request, *args, **kwargs)
+                if response.status_code == 200:
+                    scheduled_posts = (
+                        get_scheduled_posts(**kwargs)
+                        if get_scheduled_posts else None
+                    )
+                    cache.set(
+                        key, response, page_cache_timeout(scheduled_posts)
+                    )
+            return response
+        return wrapper
+    return decorator
+
+
+def latest_change(posts):
+    """Последняя наступившая pub_date публикаций и срок её хранения.
+
+    Срок не дольше, чем до ближайшей отложенной публикации. Обе даты
+    выбираются одним запросом по индексу pub_date без агрегирования.
+    """
+    now = timezone.now()
+    dates = posts.order_by().values('pub_date')
+    try:
+        dates.query.get_compiler(dates.db).as_sql()
+    except EmptyResultSet:
+        # Пустой подзапрос (например, category_id__in=[]) Django
+        # подставил бы как 0 вместо NULL.
+        return None, settings.PAGE_CACHE_TIMEOUT
+    row = next(iter(posts.model.objects.order_by().annotate(
+        last_pub_date=Subquery(
+            dates.filter(pub_date__lte=now).order_by('-pub_date')[:1]
+        ),
+        next_pub_date=Subquery(
+            dates.filter(pub_date__gt=now).order_by('pub_date')[:1]
+        ),
+    ).values('last_pub_date', 'next_pub_date')[:1]), {})
+    timeout = settings.PAGE_CACHE_TIMEOUT
+    next_pub_date = row.get('next_pub_date')
+    if next_pub_date is not None and not scheduler_resets_cache():
+        seconds = (next_pub_date - now).total_seconds()
+        timeout = min(timeout, max(int(seconds), 1))
+    return row.get('last_pub_date'), timeout
+
+
+def cached_latest_change(path, versions, posts):
+    key = 'blog:latest:{}:{}'.format(
+        hashlib.md5(path.encode()).hexdigest(),
+        '.'.join(str(value) for value in versions),
+    )
+    last_pub_date = cache.get(key)
+    if last_pub_date is None:
+        last_pub_date, timeout = latest_change(posts)
+        cache.set(key, last_pub_date or '', timeout)
+    return last_pub_date or None
+
+
+def last_modified_timestamp(scopes, last_pub_date):
+    """Last-Modified страницы в секундах или None, если его не отдавать.
+
+    Страница меняется, когда поднимаются версии её областей или выходит
+    отложенная публикация. Изменённую в текущую секунду дату не отдаём:
+    следующее изменение в ту же секунду её бы не сдвинуло.
+    """
+    changed = bumped_at(*scopes)
+    if last_pub_date is not None:
+        changed = max(changed, last_pub_date.timestamp())
+    if int(changed) >= int(clock()):
+        return None
+    return int(changed)
+
+
+def conditional_page(get_scopes, get_posts):
+    """Отвечает 304 Not Modified, не отрисовывая страницу.
+
+    ETag складывается из версий областей get_scopes, посетителя и самой
+    поздней наступившей pub_date публикаций из get_posts; эта дата
+    хранится в кеше до смены версий или выхода отложенной публикации.
+    Last-Modified — время последнего подъёма версий или той же pub_date.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return view(request, *args, **kwargs)
+            scopes = [pages_scope(), *get_scopes(**kwargs)]
+            versions = get_versions(*scopes)
+            last_pub_date = cached_latest_change(
+                request.path_info, versions, get_posts(**kwargs)
+            )
+            etag = 'W/"{}"'.format(hashlib.md5('{}:{}:{}'.format(
+                '.'.join(str(value) for value in versions),
+                request.user.pk,
+                last_pub_date.isoformat() if last_pub_date else '',
+            ).encode()).hexdigest())
+            timestamp = last_modified_timestamp(scopes, last_pub_date)
+            response = get_conditional_response(
+                request, etag=etag, last_modified=timestamp
+            )
+            if response is None:
+                response = view(request, *args, **kwargs)
+            if response.status_code in (200, 304):
+                response['ETag'] = etag
+                if timestamp is not None:
+                    response['Last-Modified'] = http_date(timestamp)
+            return response
+        return wrapper
+    return decorator
+
+
+def _count_generation():
+    return cache.get_or_set(COUNT_GENERATION_KEY, 1, None)
+
+
+def count_cache_key(scope):
+    return f'blog:count:{_count_generation()}:{scope}'
+
+
+def count_limit():
+    """Предел подсчёта в режиме 'estimated'; число сверх него — оценка."""
+    if settings.POSTS_COUNT_MODE == 'estimated':
+        return settings.POSTS_COUNT_ESTIMATE_LIMIT
+    return None
+
+
+def count_queryset(queryset):
+    queryset = queryset.order_by()
+    limit = count_limit()
+    if limit is not None:
+        return queryset[:limit + 1].count()
+    return queryset.count()
+
+
+def cached_count(scope, queryset):
+    def count():
+        key = count_cache_key(scope)
+        value = cache.get(key)
+        if value is None:
+            value = count_queryset(queryset)
+            cache.set(key, value, settings.POSTS_COUNT_CACHE_TIMEOUT)
+        return value
+    return count
+
+
+def invalidate_post_counts(category_ids):
+    scopes = [feed_scope()]
+    scopes.extend(
+        category_scope(category_id)
+        for category_id in set(category_ids) if category_id is not None
+    )
+    cache.delete_many([count_cache_key(scope) for scope in scopes])
+
+
+def invalidate_all_counts():
+    try:
+        cache.incr(COUNT_GENERATION_KEY)
+    except ValueError:
+        cache.set(COUNT_GENERATION_KEY, 2, None)
@@ -0,0 +1,107 @@
+"""Лента публикаций в отдельной узкой таблице FeedEntry.
+
+В таблице лежат опубликованные публикации опубликованных категорий
+вместе с полями, которые нужны карточке, поэтому главная и страницы
+категорий читают страницу ленты одним запросом по индексу, без
+соединения с категориями, авторами и местоположениями. Строки
+обновляют сигналы публикаций, категорий и пользователей.
+"""
+from django.db import transaction
+from django.utils.text import Truncator
+
+from .models import FeedEntry, Post
+
+# Карточка показывает первые десять слов текста; многоточие то же, что
+# у фильтра truncatewords, которым карточку отрисовывают на других страницах.
+EXCERPT_WORDS = 10
+EXCERPT_TRUNCATE = ' …'
+BATCH_SIZE = 1000
+COMPARED_FIELDS = (
+    'pub_date', 'category_id', 'location_id', 'author_id',
+    'author_username', 'title', 'excerpt', 'image', 'comment_count',
+)
+
+
+def feed_posts():
+    return Post.objects.filter(
+        is_published=True, category__is_published=True
+    ).select_related('author')
+
+
+def entry_values(post):
+    return {
+        'pub_date': post.pub_date,
+        'category_id': post.category_id,
+        'location_id': post.location_id,
+        'author_id': post.author_id,
+        'author_username': post.author.username,
+        'title': post.title,
+        'excerpt': Truncator(post.text).words(
+            EXCERPT_WORDS, truncate=EXCERPT_TRUNCATE
+        ),
+        'image': post.image.name or '',
+        'comment_count': post.comment_count,
+    }
+
+
+def sync_post(post_id):
+    post = feed_posts().filter(pk=post_id).first()
+    if post is None:
+        FeedEntry.objects.filter(post_id=post_id).delete()
+        return
+    FeedEntry.objects.update_or_create(
+        post_id=post_id, defaults=entry_values(post)
+    )
+
+
+def insert_entries(posts):
+    FeedEntry.objects.bulk_create(
+        (
+            FeedEntry(post_id=post.pk, **entry_values(post))
+            for post in posts.iterator(chunk_size=BATCH_SIZE)
+        ),
+        batch_size=BATCH_SIZE,
+    )
+
+
+@transaction.atomic
+def sync_category(category_id):
+    FeedEntry.objects.filter(category_id=category_id).delete()
+    insert_entries(feed_posts().filter(category_id=category_id))
+
+
+def rename_author(author_id, username):
+    FeedEntry.objects.filter(author_id=author_id).exclude(
+        author_username=username
+    ).update(author_username=username)
+
+
+def find_differences():
+    """id публикаций, которых не хватает в ленте, лишних и устаревших."""
+    actual = {
+        row[0]: row[1:] for row in FeedEntry.objects.values_list(
+            'post_id', *COMPARED_FIELDS
+        ).iterator(chunk_size=BATCH_SIZE)
+    }
+    missing, stale = [], []
+    for post in feed_posts().iterator(chunk_size=BATCH_SIZE):
+        values = entry_values(post)
+        row = actual.pop(post.pk, None)
+        if row is None:
+            missing.append(post.pk)
+        elif row != tuple(values[field] for field in COMPARED_FIELDS):
+            stale.append(post.pk)
+    return missing, sorted(actual), stale
+
+
+def batches(ids):
+    for start in range(0, len(ids), BATCH_SIZE):
+        yield ids[start:start + BATCH_SIZE]
+
+
+@transaction.atomic
+def repair(missing, extra, stale):
+    for ids in batches(extra + stale):
+        FeedEntry.objects.filter(post_id__in=ids).delete()
+    for ids in batches(missing + stale):
+        insert_entries(feed_posts().filter(pk__in=ids))
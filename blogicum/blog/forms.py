@@ -1,13 +1,62 @@
 from django import forms
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.template.defaultfilters import filesizeformat
+from PIL import Image
 
 from .models import Comment, Post, User
 
 
+class HeaderCheckedImageField(forms.ImageField):
+    """Проверяет изображение по заголовку, не декодируя его целиком."""
+
+    def to_python(self, data):
+        upload = forms.FileField.to_python(self, data)
+        if upload is None:
+            return None
+        if upload.size > settings.MAX_UPLOAD_SIZE:
+            raise ValidationError(
+                'Размер файла не должен превышать %s.'
+                % filesizeformat(settings.MAX_UPLOAD_SIZE),
+                code='file_too_large',
+            )
+        source = (
+            upload.temporary_file_path()
+            if hasattr(upload, 'temporary_file_path') else upload
+        )
+        try:
+            with Image.open(source) as image:
+                image_format = image.format
+                width, height = image.size
+        except Exception as error:
+            raise ValidationError(
+                self.error_messages['invalid_image'],
+                code='invalid_image',
+            ) from error
+        if image_format not in settings.ALLOWED_IMAGE_FORMATS:
+            raise ValidationError(
+                'Поддерживаются только изображения форматов %s.'
+                % ', '.join(settings.ALLOWED_IMAGE_FORMATS),
+                code='invalid_image_format',
+            )
+        if width * height > settings.MAX_IMAGE_PIXELS:
+            raise ValidationError(
+                'Изображение слишком большое: %(width)s×%(height)s пикселей.',
+                code='image_too_large',
+                params={'width': width, 'height': height},
+            )
+        upload.content_type = Image.MIME.get(image_format)
+        if hasattr(upload, 'seek') and callable(upload.seek):
+            upload.seek(0)
+        return upload
+
+
 class PostForm(forms.ModelForm):
 
     class Meta:
         model = Post
         exclude = ('author',)
+        field_classes = {'image': HeaderCheckedImageField}
 
 
 class CommentForm(forms.ModelForm):
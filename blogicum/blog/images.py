@@ -0,0 +1,52 @@
+from io import BytesIO
+from pathlib import PurePosixPath
+
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+# Варианты изображения публикации и их ширина в пикселях.
+IMAGE_VARIANTS = {
+    'card': 640,
+    'detail': 1280,
+}
+VARIANT_FORMAT = 'JPEG'
+VARIANT_QUALITY = 82
+
+
+def variant_name(name, variant):
+    path = PurePosixPath(name)
+    return str(path.with_name(f'{path.stem}_{variant}.jpg'))
+
+
+def variants_exist(field_file):
+    return all(
+        field_file.storage.exists(variant_name(field_file.name, variant))
+        for variant in IMAGE_VARIANTS
+    )
+
+
+def build_variants(field_file):
+    storage = field_file.storage
+    with field_file.open('rb'):
+        image = ImageOps.exif_transpose(Image.open(field_file))
+        image = image.convert('RGB')
+    for variant, width in IMAGE_VARIANTS.items():
+        resized = image.copy()
+        resized.thumbnail((width, width * 4), Image.Resampling.LANCZOS)
+        buffer = BytesIO()
+        resized.save(
+            buffer,
+            VARIANT_FORMAT,
+            quality=VARIANT_QUALITY,
+            optimize=True,
+            progressive=True,
+        )
+        name = variant_name(field_file.name, variant)
+        storage.delete(name)
+        save = getattr(storage, 'save_exact', storage.save)
+        save(name, ContentFile(buffer.getvalue()))
+
+
+def delete_variants(storage, name):
+    for variant in IMAGE_VARIANTS:
+        storage.delete(variant_name(name, variant))
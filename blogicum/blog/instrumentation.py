@@ -0,0 +1,184 @@
+import math
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.template import TemplateDoesNotExist
+from django.template.backends.django import DjangoTemplates
+from django.template.backends.django import Template as BackendTemplate
+from django.template.backends.django import reraise
+
+STATS_KEY = 'blog:request-stats'
+STATS_TIMEOUT = 24 * 60 * 60
+METRICS = ('total_ms', 'queries', 'db_ms', 'template_ms', 'size')
+REPORT_COLUMNS = (
+    ('Запросов', 'count'),
+    ('мс p50', 'total_ms_p50'),
+    ('мс p95', 'total_ms_p95'),
+    ('мс p99', 'total_ms_p99'),
+    ('SQL p50', 'queries_p50'),
+    ('SQL p95', 'queries_p95'),
+    ('SQL p99', 'queries_p99'),
+    ('БД мс p95', 'db_ms_p95'),
+    ('Шаблоны мс p95', 'template_ms_p95'),
+    ('Байт p50', 'size_p50'),
+)
+
+_current = ContextVar('request_metrics', default=None)
+
+
+class RequestMetrics:
+    """Счётчики одного запроса: SQL-запросы, время БД и шаблонов."""
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.template_time = 0.0
+        self._template_depth = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.db_time += time.perf_counter() - start
+
+    @contextmanager
+    def rendering(self):
+        # Вложенные render_to_string уже входят во время внешнего шаблона.
+        self._template_depth += 1
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._template_depth -= 1
+            if not self._template_depth:
+                self.template_time += time.perf_counter() - start
+
+
+@contextmanager
+def collect_metrics():
+    metrics = RequestMetrics()
+    token = _current.set(metrics)
+    try:
+        yield metrics
+    finally:
+        _current.reset(token)
+
+
+class Template(BackendTemplate):
+
+    def render(self, context=None, request=None):
+        metrics = _current.get()
+        if metrics is None:
+            return super().render(context, request)
+        with metrics.rendering():
+            return super().render(context, request)
+
+
+class InstrumentedTemplates(DjangoTemplates):
+    """Шаблоны Django, время отрисовки которых попадает в статистику."""
+
+    def from_string(self, template_code):
+        return Template(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        try:
+            return Template(self.engine.get_template(template_name), self)
+        except TemplateDoesNotExist as exc:
+            reraise(exc, self)
+
+
+def percentile(values, fraction):
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(math.ceil(fraction * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+class StatsRecorder:
+    """Последние замеры по каждому представлению в памяти процесса.
+
+    Каждые REQUEST_STATS_FLUSH_EVERY запросов копия сбрасывается в кеш,
+    чтобы статистику всех процессов могли прочитать команда request_stats
+    и страница admin/request-stats/.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.samples = defaultdict(
+                lambda: deque(maxlen=settings.REQUEST_STATS_SAMPLES)
+            )
+            self.unflushed = 0
+
+    def record(self, view_name, sample):
+        with self.lock:
+            self.samples[view_name].append(sample)
+            self.unflushed += 1
+            flush = self.unflushed >= settings.REQUEST_STATS_FLUSH_EVERY
+        if flush:
+            self.flush()
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                view_name: list(samples)
+                for view_name, samples in self.samples.items()
+            }
+
+    def flush(self):
+        snapshot = self.snapshot()
+        with self.lock:
+            self.unflushed = 0
+        if not snapshot:
+            return
+        process_key = f'{STATS_KEY}:{os.getpid()}'
+        processes = cache.get(STATS_KEY, set())
+        processes.add(process_key)
+        cache.set(STATS_KEY, processes, STATS_TIMEOUT)
+        cache.set(process_key, snapshot, STATS_TIMEOUT)
+
+
+recorder = StatsRecorder()
+
+
+def collect_stats():
+    recorder.flush()
+    merged = defaultdict(list)
+    processes = cache.get(STATS_KEY, set())
+    for snapshot in cache.get_many(processes).values():
+        for view_name, samples in snapshot.items():
+            merged[view_name].extend(samples)
+    return merged
+
+
+def reset_stats():
+    recorder.reset()
+    cache.delete_many(cache.get(STATS_KEY, set()) | {STATS_KEY})
+
+
+def summarize(stats):
+    rows = []
+    for view_name, samples in stats.items():
+        row = {'view': view_name, 'count': len(samples)}
+        for index, metric in enumerate(METRICS):
+            values = [sample[index] for sample in samples]
+            for name, fraction in (('p50', 0.5), ('p95', 0.95),
+                                   ('p99', 0.99)):
+                row[f'{metric}_{name}'] = percentile(values, fraction)
+        rows.append(row)
+    rows.sort(key=lambda row: row['total_ms_p95'], reverse=True)
+    for row in rows:
+        row['columns'] = [row[key] for _, key in REPORT_COLUMNS]
+    return rows
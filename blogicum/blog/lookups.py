@@ -0,0 +1,79 @@
+"""Категории и местоположения в памяти процесса.
+
+Их немного, а нужны они почти каждой странице, поэтому таблицы целиком
+держатся в памяти и перечитываются, когда меняется версия lookups_scope
+(её поднимают сигналы сохранения и удаления категорий и местоположений),
+но не реже раза в LOOKUP_TABLES_TIMEOUT секунд: версия в LocMemCache
+видна только своему процессу, а update() по queryset сигналов не шлёт.
+"""
+import threading
+import time
+
+from django.conf import settings
+
+from .caching import get_versions, lookups_scope
+from .models import Category, Location, Post
+
+
+class LookupTables:
+
+    def __init__(self, version):
+        self.version = version
+        self.loaded_at = time.monotonic()
+        self.categories = Category.objects.in_bulk()
+        self.locations = Location.objects.in_bulk()
+        self.category_slugs = {
+            category.slug: category for category in self.categories.values()
+        }
+        self.published_category_ids = sorted(
+            pk for pk, category in self.categories.items()
+            if category.is_published
+        )
+
+
+_tables = None
+_lock = threading.Lock()
+
+
+def is_current(tables, version):
+    return tables is not None and tables.version == version and (
+        time.monotonic() - tables.loaded_at < settings.LOOKUP_TABLES_TIMEOUT
+    )
+
+
+def get_lookup_tables():
+    global _tables
+    version, = get_versions(lookups_scope())
+    tables = _tables
+    if not is_current(tables, version):
+        with _lock:
+            if not is_current(_tables, version):
+                _tables = LookupTables(version)
+            tables = _tables
+    return tables
+
+
+def category_by_slug(slug):
+    return get_lookup_tables().category_slugs.get(slug)
+
+
+def published_category_ids():
+    return get_lookup_tables().published_category_ids
+
+
+def attach_lookups(posts):
+    """Подставляет публикациям категории и местоположения без JOIN."""
+    posts = list(posts)
+    tables = get_lookup_tables()
+    category_field = Post._meta.get_field('category')
+    location_field = Post._meta.get_field('location')
+    for post in posts:
+        if post.category_id in tables.categories:
+            category_field.set_cached_value(
+                post, tables.categories[post.category_id]
+            )
+        if post.location_id in tables.locations:
+            location_field.set_cached_value(
+                post, tables.locations[post.location_id]
+            )
+    return posts
@@ -0,0 +1,209 @@
+import json
+import random
+import threading
+import time
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test import Client
+from django.urls import reverse
+from django.utils import timezone
+
+from blog.instrumentation import percentile
+from blog.models import Category, Post, User
+
+ENDPOINT_WEIGHTS = {
+    'blog:index': 30,
+    'blog:category_posts': 15,
+    'blog:profile': 10,
+    'blog:post_detail': 35,
+    'blog:post_comments': 5,
+    'pages': 5,
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Отправляет представлениям блога запросы в несколько потоков и'
+        ' выводит RPS и перцентили задержки по каждому адресу.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=1000)
+        parser.add_argument('--concurrency', type=int, default=4)
+        parser.add_argument(
+            '--logged-in-share',
+            type=float,
+            default=0.2,
+            help='Доля запросов от авторизованных пользователей.',
+        )
+        parser.add_argument('--host', default='localhost')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--output', help='Сохранить результаты в JSON-файл.'
+        )
+        parser.add_argument(
+            '--baseline',
+            help='JSON-файл прошлого запуска для сравнения.',
+        )
+
+    def handle(self, *args, **options):
+        self.random = random.Random(options['seed'])
+        plan = self.build_plan(options['requests'],
+                               options['logged_in_share'])
+        results, errors, wall_time = self.run_plan(
+            plan, max(options['concurrency'], 1), options['host']
+        )
+        report = self.build_report(results, errors, wall_time)
+        baseline = self.load_baseline(options['baseline'])
+        self.print_report(report, baseline)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                json.dump(report, file, ensure_ascii=False, indent=2)
+
+    def run_plan(self, plan, concurrency, host):
+        results = defaultdict(list)
+        errors = defaultdict(int)
+        lock = threading.Lock()
+        users = list(User.objects.filter(
+            posts__isnull=False
+        ).distinct().values_list('pk', flat=True)[:100])
+
+        def worker(number):
+            clients = {False: Client(SERVER_NAME=host)}
+            if users:
+                clients[True] = Client(SERVER_NAME=host)
+                clients[True].force_login(
+                    User.objects.get(pk=users[number % len(users)])
+                )
+            for endpoint, url, logged_in in plan[number::concurrency]:
+                client = clients.get(logged_in, clients[False])
+                start = time.perf_counter()
+                response = client.get(url)
+                elapsed = (time.perf_counter() - start) * 1000
+                with lock:
+                    results[endpoint].append(elapsed)
+                    if response.status_code >= 400:
+                        errors[endpoint] += 1
+
+        def thread_worker(number):
+            try:
+                worker(number)
+            finally:
+                connections.close_all()
+
+        start = time.perf_counter()
+        if concurrency == 1:
+            worker(0)
+        else:
+            threads = [
+                threading.Thread(target=thread_worker, args=(number,))
+                for number in range(concurrency)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        return results, errors, time.perf_counter() - start
+
+    def build_plan(self, count, logged_in_share):
+        now = timezone.now()
+        visible = Post.objects.filter(
+            is_published=True,
+            pub_date__lte=now,
+            category__is_published=True,
+        )
+        posts = list(visible.values_list('pk', 'comment_count'))
+        if not posts:
+            raise CommandError(
+                'Нет опубликованных публикаций: сначала выполните'
+                ' python manage.py seed_benchmark.'
+            )
+        # Публикации с большим числом комментариев открывают чаще.
+        post_weights = [comment_count + 1 for _, comment_count in posts]
+        slugs = list(Category.objects.filter(
+            posts__in=visible
+        ).distinct().values_list('slug', flat=True))
+        usernames = list(User.objects.filter(
+            posts__in=visible
+        ).distinct().values_list('username', flat=True)[:1000])
+
+        def make_url(endpoint):
+            if endpoint == 'blog:index':
+                return '{}?page={}'.format(
+                    reverse(endpoint), self.random.randint(1, 5)
+                )
+            if endpoint == 'blog:category_posts':
+                return reverse(endpoint, kwargs={
+                    'category_slug': self.random.choice(slugs)
+                })
+            if endpoint == 'blog:profile':
+                return reverse(endpoint, kwargs={
+                    'username': self.random.choice(usernames)
+                })
+            if endpoint == 'pages':
+                return reverse(self.random.choice(
+                    ['pages:about', 'pages:rules']
+                ))
+            (pk, _), = self.random.choices(posts, post_weights)
+            return reverse(endpoint, kwargs={'pk': pk})
+
+        endpoints = self.random.choices(
+            list(ENDPOINT_WEIGHTS), list(ENDPOINT_WEIGHTS.values()), k=count
+        )
+        return [
+            (endpoint, make_url(endpoint),
+             self.random.random() < logged_in_share)
+            for endpoint in endpoints
+        ]
+
+    def build_report(self, results, errors, wall_time):
+        endpoints = {}
+        for endpoint, latencies in sorted(results.items()):
+            endpoints[endpoint] = {
+                'requests': len(latencies),
+                'errors': errors[endpoint],
+                'rps': round(len(latencies) / wall_time, 1),
+                'p50': round(percentile(latencies, 0.5), 1),
+                'p95': round(percentile(latencies, 0.95), 1),
+                'p99': round(percentile(latencies, 0.99), 1),
+                'max': round(max(latencies), 1),
+            }
+        total = sum(len(latencies) for latencies in results.values())
+        return {
+            'requests': total,
+            'seconds': round(wall_time, 2),
+            'rps': round(total / wall_time, 1),
+            'endpoints': endpoints,
+        }
+
+    def load_baseline(self, path):
+        if not path:
+            return None
+        try:
+            with open(path, encoding='utf-8') as file:
+                return json.load(file)
+        except (OSError, ValueError) as error:
+            raise CommandError(f'Не удалось прочитать {path}: {error}')
+
+    def print_report(self, report, baseline):
+        columns = ('requests', 'errors', 'rps', 'p50', 'p95', 'p99', 'max')
+        self.stdout.write('{:<22}'.format('Адрес') + ''.join(
+            f'{column:>10}' for column in columns
+        ) + ('{:>12}'.format('p95 было') if baseline else ''))
+        for endpoint, row in report['endpoints'].items():
+            line = f'{endpoint:<22}' + ''.join(
+                f'{row[column]:>10}' for column in columns
+            )
+            if baseline:
+                previous = baseline['endpoints'].get(endpoint)
+                line += '{:>12}'.format(previous['p95'] if previous else '-')
+            self.stdout.write(line)
+        summary = (
+            f'Всего {report["requests"]} запросов за {report["seconds"]} с:'
+            f' {report["rps"]} RPS'
+        )
+        if baseline:
+            summary += f' (было {baseline["rps"]} RPS)'
+        self.stdout.write(self.style.SUCCESS(summary))
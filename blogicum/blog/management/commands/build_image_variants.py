@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+
+from blog.images import build_variants, variants_exist
+from blog.models import Post
+
+
+class Command(BaseCommand):
+    help = 'Создаёт уменьшенные варианты изображений публикаций.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Пересоздать варианты, даже если они уже есть.',
+        )
+
+    def handle(self, *args, **options):
+        built = failed = 0
+        posts = Post.objects.exclude(image='').only('id', 'image')
+        for post in posts.iterator():
+            if not options['force'] and variants_exist(post.image):
+                continue
+            try:
+                build_variants(post.image)
+            except (OSError, ValueError) as error:
+                failed += 1
+                self.stderr.write(f'Публикация {post.id}: {error}')
+                continue
+            built += 1
+        self.stdout.write(self.style.SUCCESS(
+            f'Создано вариантов: {built}, ошибок: {failed}'
+        ))
@@ -0,0 +1,191 @@
+import json
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+
+from django.apps import apps
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+from blog.caching import bump_versions, invalidate_all_counts, pages_scope
+from blog.scheduler import rebuild_schedule
+
+# Модели загружаются в порядке зависимостей по внешним ключам.
+MODEL_ORDER = (
+    settings.AUTH_USER_MODEL.lower(),
+    'blog.category',
+    'blog.location',
+    'blog.post',
+    'blog.comment',
+)
+SEPARATORS = ' \t\r\n,'
+
+
+def label_of(obj):
+    return '{}:{}'.format(obj.get('model'), obj.get('pk'))
+
+
+def iter_json_array(file, chunk_size=64 * 1024):
+    """Читает объекты JSON-массива по одному, не загружая файл целиком."""
+    decoder = json.JSONDecoder()
+    buffer = file.read(chunk_size).lstrip()
+    if not buffer.startswith('['):
+        raise CommandError('Ожидается JSON-массив объектов, как у dumpdata.')
+    position = 1
+    while True:
+        while position < len(buffer) and buffer[position] in SEPARATORS:
+            position += 1
+        if buffer[position:position + 1] == ']':
+            return
+        try:
+            obj, position = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError:
+            chunk = file.read(chunk_size)
+            if not chunk:
+                raise CommandError('Файл обрывается посреди объекта.')
+            buffer = buffer[position:] + chunk
+            position = 0
+            continue
+        yield obj
+
+
+class Command(BaseCommand):
+    help = (
+        'Быстро загружает публикации, комментарии, категории,'
+        ' местоположения и пользователей из файла в формате dumpdata.'
+        ' Файл читается потоком, объекты вставляются пачками без сигналов'
+        ' и save(). Остальные модели из файла пропускаются, связи'
+        ' пользователей с группами и правами не переносятся.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('fixture', help='Путь к JSON-файлу.')
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument(
+            '--drop-indexes',
+            action='store_true',
+            help='Удалить индексы моделей блога на время загрузки.',
+        )
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        self.using = options['database']
+        self.batch_size = options['batch_size']
+        self.models = [apps.get_model(label) for label in MODEL_ORDER]
+        self.buffers = defaultdict(list)
+        self.loaded = Counter()
+        self.skipped = Counter()
+        start = time.perf_counter()
+        try:
+            file = open(options['fixture'], encoding='utf-8')
+        except OSError as error:
+            raise CommandError(f'Не удалось открыть файл: {error}')
+        with file, self.indexes_dropped(options['drop_indexes']):
+            with transaction.atomic(using=self.using):
+                for obj in iter_json_array(file):
+                    self.add(obj)
+                for model in self.models:
+                    self.flush(model)
+                connections[self.using].check_constraints(
+                    table_names=[model._meta.db_table for model in self.models]
+                )
+                self.reset_sequences()
+        elapsed = time.perf_counter() - start
+        call_command('recount_comments', stdout=self.stdout)
+        call_command('rebuild_search_index', stdout=self.stdout)
+        call_command('rebuild_author_stats', stdout=self.stdout)
+        call_command('check_feed', '--repair', stdout=self.stdout)
+        self.stdout.write(f'Отложенных публикаций: {rebuild_schedule()}')
+        invalidate_all_counts()
+        bump_versions(pages_scope())
+        self.report(elapsed)
+
+    def add(self, obj):
+        label = obj.get('model', '').lower()
+        if label not in MODEL_ORDER:
+            self.skipped[label] += 1
+            return
+        model = apps.get_model(label)
+        self.buffers[model].append(self.to_row(model, obj))
+        if len(self.buffers[model]) >= self.batch_size:
+            # Сначала вставляются накопленные объекты, на которые могут
+            # ссылаться объекты этой модели.
+            for dependency in self.models[:self.models.index(model) + 1]:
+                self.flush(dependency)
+
+    def to_row(self, model, obj):
+        connection = connections[self.using]
+        values = obj.get('fields', {})
+        row = []
+        for field in model._meta.local_concrete_fields:
+            if field.primary_key:
+                if obj.get('pk') is None:
+                    raise CommandError(f'У объекта {label_of(obj)} нет pk.')
+                value = field.to_python(obj['pk'])
+            elif field.name in values:
+                value = field.to_python(values[field.name])
+            else:
+                value = field.get_default()
+            row.append(field.get_db_prep_save(value, connection))
+        return row
+
+    def flush(self, model):
+        rows = self.buffers.pop(model, [])
+        if not rows:
+            return
+        connection = connections[self.using]
+        quote_name = connection.ops.quote_name
+        fields = model._meta.local_concrete_fields
+        # Значения уже подготовлены полями, поэтому строки вставляются
+        # напрямую, без save(), сигналов и auto_now_add.
+        sql = 'INSERT INTO {} ({}) VALUES ({})'.format(
+            quote_name(model._meta.db_table),
+            ', '.join(quote_name(field.column) for field in fields),
+            ', '.join(['%s'] * len(fields)),
+        )
+        with connection.cursor() as cursor:
+            cursor.executemany(sql, rows)
+        self.loaded[model._meta.label] += len(rows)
+
+    def reset_sequences(self):
+        connection = connections[self.using]
+        statements = connection.ops.sequence_reset_sql(no_style(), self.models)
+        with connection.cursor() as cursor:
+            for sql in statements:
+                cursor.execute(sql)
+
+    @contextmanager
+    def indexes_dropped(self, drop):
+        indexes = [
+            (model, index)
+            for model in self.models for index in model._meta.indexes
+        ] if drop else []
+        connection = connections[self.using]
+        if indexes:
+            with connection.schema_editor() as editor:
+                for model, index in indexes:
+                    editor.remove_index(model, index)
+        try:
+            yield
+        finally:
+            if indexes:
+                self.stdout.write('Восстановление индексов...')
+                with connection.schema_editor() as editor:
+                    for model, index in indexes:
+                        editor.add_index(model, index)
+
+    def report(self, elapsed):
+        total = sum(self.loaded.values())
+        for model in self.models:
+            self.stdout.write(
+                f'{model._meta.label}: {self.loaded[model._meta.label]}'
+            )
+        for label, count in self.skipped.items():
+            self.stdout.write(f'Пропущено {label}: {count}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Загружено объектов: {total} за {elapsed:.1f} с'
+            f' ({total / max(elapsed, 1e-6):.0f} объектов/с)'
+        ))
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from blog.caching import bump_versions, invalidate_all_counts, pages_scope
+from blog.feed import find_differences, repair
+
+
+class Command(BaseCommand):
+    help = (
+        'Сверяет таблицу ленты с публикациями: ищет недостающие, лишние и'
+        ' устаревшие записи.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--repair',
+            action='store_true',
+            help='Исправить найденные расхождения.',
+        )
+
+    def handle(self, *args, **options):
+        missing, extra, stale = find_differences()
+        self.stdout.write(
+            f'Не хватает: {len(missing)}, лишних: {len(extra)},'
+            f' устаревших: {len(stale)}'
+        )
+        if not options['repair'] or not (missing or extra or stale):
+            return
+        repair(missing, extra, stale)
+        invalidate_all_counts()
+        bump_versions(pages_scope())
+        self.stdout.write(self.style.SUCCESS('Лента исправлена.'))
@@ -0,0 +1,66 @@
+import posixpath
+import time
+
+from django.core.management.base import BaseCommand
+
+from blog.images import IMAGE_VARIANTS, variant_name
+from blog.models import Post
+from blog.storage import post_image_storage
+
+
+def walk(storage, directory):
+    directories, files = storage.listdir(directory)
+    for name in files:
+        yield posixpath.join(directory, name)
+    for name in directories:
+        yield from walk(storage, posixpath.join(directory, name))
+
+
+class Command(BaseCommand):
+    help = (
+        'Удаляет файлы изображений, на которые не ссылается ни одна '
+        'публикация.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Только показать файлы, которые будут удалены.',
+        )
+        parser.add_argument(
+            '--min-age',
+            type=int,
+            default=60 * 60,
+            help='Не трогать файлы моложе указанного числа секунд.',
+        )
+
+    def handle(self, *args, **options):
+        storage = post_image_storage
+        upload_to = Post._meta.get_field('image').upload_to
+        if not storage.exists(upload_to):
+            return
+        referenced = set()
+        images = Post.objects.exclude(image='').values_list('image', flat=True)
+        for name in images.iterator():
+            referenced.add(name)
+            referenced.update(
+                variant_name(name, variant) for variant in IMAGE_VARIANTS
+            )
+        min_mtime = time.time() - options['min_age']
+        removed = freed = 0
+        for name in walk(storage, upload_to):
+            if name in referenced:
+                continue
+            if storage.get_modified_time(name).timestamp() > min_mtime:
+                continue
+            size = storage.size(name)
+            if not options['dry_run']:
+                storage.delete(name)
+            removed += 1
+            freed += size
+            self.stdout.write(name)
+        action = 'Будет удалено' if options['dry_run'] else 'Удалено'
+        self.stdout.write(self.style.SUCCESS(
+            f'{action} файлов: {removed}, {freed / 1024 / 1024:.1f} МБ'
+        ))
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+
+from blog.author_stats import (STATS_FIELDS, compute_stats, empty_stats,
+                               rebuild_author_stats)
+from blog.models import AuthorStats
+
+
+class Command(BaseCommand):
+    help = 'Заново считает статистику публикаций и комментариев авторов.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Только показать число авторов с расходящейся статистикой.',
+        )
+
+    def handle(self, *args, **options):
+        if options['check']:
+            computed = compute_stats()
+            broken = sum(
+                1 for stats in AuthorStats.objects.all()
+                if computed.get(stats.author_id, empty_stats()) != {
+                    field: getattr(stats, field) for field in STATS_FIELDS
+                }
+            )
+            self.stdout.write(f'Расходящейся статистики: {broken}')
+            return
+        count = rebuild_author_stats()
+        self.stdout.write(
+            self.style.SUCCESS(f'Пересчитана статистика авторов: {count}')
+        )
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from blog.search import rebuild_index
+
+
+class Command(BaseCommand):
+    help = 'Заново строит поисковый индекс публикаций и комментариев.'
+
+    def handle(self, *args, **options):
+        count = rebuild_index()
+        self.stdout.write(
+            self.style.SUCCESS(f'Проиндексировано публикаций: {count}')
+        )
@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from blog.models import Comment, FeedEntry, Post
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает счётчики комментариев у публикаций.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Только показать число расходящихся счётчиков.',
+        )
+
+    def handle(self, *args, **options):
+        comments = Comment.objects.filter(
+            post=OuterRef('pk')
+        ).order_by().values('post').annotate(
+            total=Count('pk')
+        ).values('total')
+        actual = Coalesce(Subquery(comments), 0)
+        broken = Post.objects.alias(actual=actual).exclude(
+            comment_count=actual
+        )
+        if options['check']:
+            self.stdout.write(f'Расходящихся счётчиков: {broken.count()}')
+            return
+        fixed = broken.update(comment_count=actual)
+        # У записи ленты pk совпадает с id публикации.
+        FeedEntry.objects.alias(actual=actual).exclude(
+            comment_count=actual
+        ).update(comment_count=actual)
+        self.stdout.write(
+            self.style.SUCCESS(f'Исправлено счётчиков: {fixed}')
+        )
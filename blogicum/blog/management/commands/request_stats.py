@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from blog import caching
+from blog.instrumentation import (REPORT_COLUMNS, collect_stats,
+                                  reset_stats, summarize)
+
+
+class Command(BaseCommand):
+    help = (
+        'Показывает перцентили времени ответа, числа SQL-запросов, времени'
+        ' БД и шаблонов по представлениям.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--reset',
+            action='store_true',
+            help='Очистить накопленную статистику.',
+        )
+
+    def handle(self, *args, **options):
+        if not caching.cache_is_shared():
+            raise CommandError(
+                'Кеш по умолчанию виден только своему процессу, и команде не'
+                ' видна статистика процессов сайта. Подключите общий кеш'
+                ' (BLOGICUM_CACHE_TABLE).'
+            )
+        if options['reset']:
+            reset_stats()
+            self.stdout.write(self.style.SUCCESS('Статистика очищена'))
+            return
+        rows = summarize(collect_stats())
+        if not rows:
+            self.stdout.write('Статистика пока не собрана')
+            return
+        headers = ['Представление'] + [name for name, _ in REPORT_COLUMNS]
+        table = [headers] + [
+            [row['view']] + [str(value) for value in row['columns']]
+            for row in rows
+        ]
+        widths = [max(len(line[index]) for line in table)
+                  for index in range(len(headers))]
+        for line in table:
+            self.stdout.write('  '.join(
+                value.ljust(width) for value, width in zip(line, widths)
+            ))
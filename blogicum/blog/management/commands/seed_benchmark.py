@@ -0,0 +1,194 @@
+import random
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from blog.caching import bump_versions, invalidate_all_counts, pages_scope
+from blog.models import Category, Comment, Location, Post, User
+from blog.scheduler import rebuild_schedule
+
+USERNAME_PREFIX = 'bench_user_'
+SLUG_PREFIX = 'bench-'
+BENCH_PASSWORD = 'bench-password'
+
+
+class Command(BaseCommand):
+    help = (
+        'Заполняет базу синтетическими данными для нагрузочного'
+        ' тестирования (python manage.py bench_requests).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=200)
+        parser.add_argument('--categories', type=int, default=20)
+        parser.add_argument('--locations', type=int, default=50)
+        parser.add_argument('--posts', type=int, default=20000)
+        parser.add_argument('--comments', type=int, default=100000)
+        parser.add_argument(
+            '--hot-share',
+            type=float,
+            default=0.01,
+            help='Доля «горячих» публикаций с половиной комментариев.',
+        )
+        parser.add_argument(
+            '--scheduled-share',
+            type=float,
+            default=0.05,
+            help='Доля отложенных публикаций с pub_date в будущем.',
+        )
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--clear',
+            action='store_true',
+            help='Удалить данные предыдущего заполнения.',
+        )
+
+    def handle(self, *args, **options):
+        self.random = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        self.now = timezone.now()
+        if options['clear']:
+            self.clear()
+        with transaction.atomic():
+            users = self.create_users(options['users'])
+            categories = self.create_categories(options['categories'])
+            locations = self.create_locations(options['locations'])
+            posts = self.create_posts(
+                options['posts'], users, categories, locations,
+                options['scheduled_share'],
+            )
+            comments = self.create_comments(
+                options['comments'], posts, users, options['hot_share']
+            )
+        invalidate_all_counts()
+        bump_versions(pages_scope())
+        call_command('rebuild_search_index', stdout=self.stdout)
+        call_command('rebuild_author_stats', stdout=self.stdout)
+        call_command('check_feed', '--repair', stdout=self.stdout)
+        self.stdout.write(f'Отложенных публикаций: {rebuild_schedule()}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Создано: пользователей {len(users)}, категорий'
+            f' {len(categories)}, местоположений {len(locations)},'
+            f' публикаций {len(posts)}, комментариев {comments}.'
+            f' Пароль пользователей: {BENCH_PASSWORD}'
+        ))
+
+    def clear(self):
+        User.objects.filter(username__startswith=USERNAME_PREFIX).delete()
+        Category.objects.filter(slug__startswith=SLUG_PREFIX).delete()
+        Location.objects.filter(name__startswith=SLUG_PREFIX).delete()
+
+    def create_users(self, count):
+        start = User.objects.filter(
+            username__startswith=USERNAME_PREFIX
+        ).count()
+        password = make_password(BENCH_PASSWORD)
+        User.objects.bulk_create(
+            (
+                User(
+                    username=f'{USERNAME_PREFIX}{start + number}',
+                    first_name=f'Автор {start + number}',
+                    password=password,
+                )
+                for number in range(count)
+            ),
+            batch_size=self.batch_size,
+        )
+        return list(User.objects.filter(
+            username__startswith=USERNAME_PREFIX
+        ).values_list('pk', flat=True))
+
+    def create_categories(self, count):
+        start = Category.objects.filter(slug__startswith=SLUG_PREFIX).count()
+        Category.objects.bulk_create(
+            Category(
+                title=f'Категория {start + number}',
+                description='Категория для нагрузочного тестирования.',
+                slug=f'{SLUG_PREFIX}{start + number}',
+                is_published=self.random.random() > 0.1,
+            )
+            for number in range(count)
+        )
+        return list(Category.objects.filter(
+            slug__startswith=SLUG_PREFIX
+        ).values_list('pk', flat=True))
+
+    def create_locations(self, count):
+        Location.objects.bulk_create(
+            Location(name=f'{SLUG_PREFIX}место {number}')
+            for number in range(count)
+        )
+        return list(Location.objects.filter(
+            name__startswith=SLUG_PREFIX
+        ).values_list('pk', flat=True))
+
+    def create_posts(self, count, users, categories, locations,
+                     scheduled_share):
+        def pub_date():
+            if self.random.random() < scheduled_share:
+                return self.now + timedelta(
+                    minutes=self.random.randint(1, 30 * 24 * 60)
+                )
+            return self.now - timedelta(
+                minutes=self.random.randint(1, 365 * 24 * 60)
+            )
+
+        last_pk = Post.objects.aggregate(last_pk=Max('pk'))['last_pk'] or 0
+        Post.objects.bulk_create(
+            (
+                Post(
+                    title=f'Публикация {number}',
+                    text='Текст публикации. ' * self.random.randint(5, 100),
+                    pub_date=pub_date(),
+                    author_id=self.random.choice(users),
+                    category_id=self.random.choice(categories),
+                    location_id=(
+                        self.random.choice(locations)
+                        if self.random.random() < 0.7 else None
+                    ),
+                    is_published=self.random.random() > 0.05,
+                )
+                for number in range(count)
+            ),
+            batch_size=self.batch_size,
+        )
+        # SQLite не возвращает id из bulk_create, поэтому они читаются заново.
+        return list(Post.objects.filter(
+            pk__gt=last_pk
+        ).order_by('pk').values_list('pk', flat=True))
+
+    def create_comments(self, count, posts, users, hot_share):
+        # Половина комментариев достаётся «горячим» публикациям,
+        # остальные распределяются равномерно.
+        hot_posts = posts[:max(int(len(posts) * hot_share), 1)]
+        counts = dict.fromkeys(posts, 0)
+        comments = []
+        for _ in range(count):
+            post_id = self.random.choice(
+                hot_posts if self.random.random() < 0.5 else posts
+            )
+            counts[post_id] += 1
+            comments.append(Comment(
+                text='Комментарий. ' * self.random.randint(1, 20),
+                post_id=post_id,
+                author_id=self.random.choice(users),
+            ))
+            if len(comments) >= self.batch_size:
+                Comment.objects.bulk_create(comments)
+                comments = []
+        Comment.objects.bulk_create(comments)
+        Post.objects.bulk_update(
+            [
+                Post(pk=post_id, comment_count=total)
+                for post_id, total in counts.items() if total
+            ],
+            ['comment_count'],
+            batch_size=self.batch_size,
+        )
+        return count
@@ -0,0 +1,81 @@
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+from .instrumentation import collect_metrics, recorder
+from .routers import pinned_to_primary
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+class ReplicaStickinessMiddleware:
+    """Направляет чтения в основную базу сразу после записи.
+
+    Запросы с изменениями читают только из основной базы, а автор ещё
+    REPLICA_STICKY_SECONDS секунд видит свои данные без задержки реплики.
+    """
+
+    cookie_name = 'blog_primary'
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        is_write = request.method not in SAFE_METHODS
+        pinned = is_write or self.cookie_name in request.COOKIES
+        with pinned_to_primary(pinned):
+            response = self.get_response(request)
+        if is_write and request.user.is_authenticated:
+            response.set_cookie(
+                self.cookie_name,
+                '1',
+                max_age=settings.REPLICA_STICKY_SECONDS,
+                httponly=True,
+                samesite='Lax',
+            )
+        return response
+
+
+class InstrumentationMiddleware:
+    """Замеряет запросы к базе, время БД и шаблонов для каждого представления.
+
+    Замеры уходят в заголовок Server-Timing и в статистику процесса
+    (python manage.py request_stats, admin/request-stats/).
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.REQUEST_STATS_ENABLED:
+            return self.get_response(request)
+        start = time.perf_counter()
+        with collect_metrics() as metrics, ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(metrics))
+            response = self.get_response(request)
+        total = time.perf_counter() - start
+        if response.streaming:
+            size = int(response.get('Content-Length', 0))
+        else:
+            size = len(response.content)
+        response['Server-Timing'] = (
+            f'db;dur={metrics.db_time * 1000:.1f};'
+            f'desc="{metrics.queries} queries", '
+            f'tpl;dur={metrics.template_time * 1000:.1f}, '
+            f'total;dur={total * 1000:.1f}'
+        )
+        match = request.resolver_match
+        recorder.record(
+            match.view_name if match else 'unresolved',
+            (
+                round(total * 1000, 1),
+                metrics.queries,
+                round(metrics.db_time * 1000, 1),
+                round(metrics.template_time * 1000, 1),
+                size,
+            ),
+        )
+        return response
@@ -0,0 +1,92 @@
+# Generated by Django 3.2.16 on 2026-10-18 03:21
+
+from collections import Counter, defaultdict
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+from blog.stemming import terms
+
+FTS_TABLE = 'blog_post_search'
+FIELD_WEIGHTS = (('title', 3.0), ('text', 1.0), ('comments', 0.5))
+
+
+def fts5_supported(connection):
+    if connection.vendor != 'sqlite':
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute('PRAGMA compile_options')
+        return 'ENABLE_FTS5' in {row[0] for row in cursor.fetchall()}
+
+
+def create_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    db = connection.alias
+    Post = apps.get_model('blog', 'Post')
+    Comment = apps.get_model('blog', 'Comment')
+    SearchTerm = apps.get_model('blog', 'SearchTerm')
+    use_fts5 = fts5_supported(connection)
+    if use_fts5:
+        schema_editor.execute(
+            f'CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5('
+            "title, text, comments, tokenize='unicode61 remove_diacritics 0')"
+        )
+    comments = defaultdict(list)
+    for post_id, text in Comment.objects.using(db).values_list('post_id', 'text'):
+        comments[post_id].append(text)
+    for post in Post.objects.using(db).values('pk', 'title', 'text').iterator():
+        document = {
+            'title': terms(post['title']),
+            'text': terms(post['text']),
+            'comments': terms(' '.join(comments[post['pk']])),
+        }
+        if use_fts5:
+            schema_editor.execute(
+                f'INSERT INTO {FTS_TABLE} (rowid, title, text, comments)'
+                ' VALUES (%s, %s, %s, %s)',
+                [post['pk']] + [
+                    ' '.join(document[field]) for field, _ in FIELD_WEIGHTS
+                ],
+            )
+            continue
+        weights = Counter()
+        for field, weight in FIELD_WEIGHTS:
+            for term in document[field]:
+                weights[term[:64]] += weight
+        SearchTerm.objects.using(db).bulk_create(
+            SearchTerm(post_id=post['pk'], term=term, weight=weight)
+            for term, weight in weights.items()
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0008_post_image_storage'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchTerm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(max_length=64, verbose_name='Термин')),
+                ('weight', models.FloatField(verbose_name='Вес')),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_terms', to='blog.post', verbose_name='Публикация')),
+            ],
+            options={
+                'verbose_name': 'поисковый термин',
+                'verbose_name_plural': 'Поисковые термины',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='searchterm',
+            index=models.Index(fields=['term', 'post'], name='searchterm_term_post_idx'),
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
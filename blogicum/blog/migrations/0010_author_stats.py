@@ -0,0 +1,64 @@
+# Generated by Django 3.2.16 on 2026-10-18 03:31
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Max, Min, Q, Sum
+from django.db.models.functions import Coalesce
+import django.db.models.deletion
+from django.utils import timezone
+
+
+def fill_author_stats(apps, schema_editor):
+    db = schema_editor.connection.alias
+    User = apps.get_model(*settings.AUTH_USER_MODEL.split('.'))
+    Post = apps.get_model('blog', 'Post')
+    AuthorStats = apps.get_model('blog', 'AuthorStats')
+    now = timezone.now()
+    published = Q(is_published=True, category__is_published=True)
+    visible = published & Q(pub_date__lte=now)
+    computed = {
+        row.pop('author_id'): row
+        for row in Post.objects.using(db).order_by().values('author_id').annotate(
+            total_posts=Count('pk'),
+            published_posts=Count('pk', filter=visible),
+            comments_received=Coalesce(
+                Sum('comment_count', filter=visible), 0
+            ),
+            last_post_date=Max('pub_date', filter=visible),
+            next_pub_date=Min('pub_date', filter=published & ~visible),
+        )
+    }
+    AuthorStats.objects.using(db).bulk_create(
+        (
+            AuthorStats(author_id=author_id, **computed.get(author_id, {}))
+            for author_id in User.objects.using(db).values_list('pk', flat=True)
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('blog', '0009_search'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuthorStats',
+            fields=[
+                ('author', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='post_stats', serialize=False, to=settings.AUTH_USER_MODEL, verbose_name='Автор')),
+                ('total_posts', models.PositiveIntegerField(default=0, verbose_name='Всего публикаций')),
+                ('published_posts', models.PositiveIntegerField(default=0, verbose_name='Опубликовано')),
+                ('comments_received', models.PositiveIntegerField(default=0, verbose_name='Комментариев к публикациям')),
+                ('last_post_date', models.DateTimeField(blank=True, null=True, verbose_name='Последняя публикация')),
+                ('next_pub_date', models.DateTimeField(blank=True, null=True, verbose_name='Ближайшая отложенная публикация')),
+            ],
+            options={
+                'verbose_name': 'статистика автора',
+                'verbose_name_plural': 'Статистика авторов',
+            },
+        ),
+        migrations.RunPython(fill_author_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 3.2.16 on 2026-10-18 03:37
+
+from django.db import migrations, models
+import django.db.models.deletion
+from django.utils import timezone
+
+
+def fill_schedule(apps, schema_editor):
+    db = schema_editor.connection.alias
+    Post = apps.get_model('blog', 'Post')
+    ScheduledPublication = apps.get_model('blog', 'ScheduledPublication')
+    ScheduledPublication.objects.using(db).bulk_create(
+        (
+            ScheduledPublication(post_id=pk, pub_date=pub_date)
+            for pk, pub_date in Post.objects.using(db).filter(
+                is_published=True, pub_date__gt=timezone.now()
+            ).values_list('pk', 'pub_date')
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0010_author_stats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScheduledPublication',
+            fields=[
+                ('post', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='scheduled_publication', serialize=False, to='blog.post', verbose_name='Публикация')),
+                ('pub_date', models.DateTimeField(db_index=True, verbose_name='Дата и время публикации')),
+            ],
+            options={
+                'verbose_name': 'отложенная публикация',
+                'verbose_name_plural': 'Отложенные публикации',
+                'ordering': ['pub_date'],
+            },
+        ),
+        migrations.RunPython(fill_schedule, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,77 @@
+# Generated by Django 3.2.16 on 2026-10-18 03:39
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+from django.utils.text import Truncator
+
+EXCERPT_WORDS = 10
+EXCERPT_TRUNCATE = ' …'
+
+
+def fill_feed(apps, schema_editor):
+    db = schema_editor.connection.alias
+    Post = apps.get_model('blog', 'Post')
+    FeedEntry = apps.get_model('blog', 'FeedEntry')
+    posts = Post.objects.using(db).filter(
+        is_published=True, category__is_published=True
+    ).select_related('author')
+    FeedEntry.objects.using(db).bulk_create(
+        (
+            FeedEntry(
+                post_id=post.pk,
+                pub_date=post.pub_date,
+                category_id=post.category_id,
+                location_id=post.location_id,
+                author_id=post.author_id,
+                author_username=post.author.username,
+                title=post.title,
+                excerpt=Truncator(post.text).words(
+                    EXCERPT_WORDS, truncate=EXCERPT_TRUNCATE
+                ),
+                image=post.image.name or '',
+                comment_count=post.comment_count,
+            )
+            for post in posts.iterator(chunk_size=1000)
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('blog', '0011_scheduled_publication'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FeedEntry',
+            fields=[
+                ('post', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='feed_entry', serialize=False, to='blog.post', verbose_name='Публикация')),
+                ('pub_date', models.DateTimeField(verbose_name='Дата и время публикации')),
+                ('author_username', models.CharField(max_length=150, verbose_name='Имя автора')),
+                ('title', models.CharField(max_length=256, verbose_name='Заголовок')),
+                ('excerpt', models.TextField(verbose_name='Начало текста')),
+                ('image', models.CharField(blank=True, max_length=100, verbose_name='Фото')),
+                ('comment_count', models.PositiveIntegerField(default=0, verbose_name='Количество комментариев')),
+                ('author', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='feed_entries', to=settings.AUTH_USER_MODEL, verbose_name='Автор публикации')),
+                ('category', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='feed_entries', to='blog.category', verbose_name='Категория')),
+                ('location', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='feed_entries', to='blog.location', verbose_name='Местоположение')),
+            ],
+            options={
+                'verbose_name': 'запись ленты',
+                'verbose_name_plural': 'Лента',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='feedentry',
+            index=models.Index(fields=['-pub_date', '-post'], name='feedentry_pub_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='feedentry',
+            index=models.Index(fields=['category', '-pub_date', '-post'], name='feedentry_category_idx'),
+        ),
+        migrations.RunPython(fill_feed, migrations.RunPython.noop),
+    ]
@@ -1,5 +1,9 @@
 from django.contrib.auth import get_user_model
 from django.db import models
+from django.utils import timezone
+
+from .images import IMAGE_VARIANTS, variant_name
+from .storage import post_image_storage
 
 User = get_user_model()
 
@@ -52,6 +56,7 @@ class Location(AbstractBase):
 
 
 TITLE_LIMIT = 30
+SEARCH_TERM_LENGTH = 64
 
 
 class Post(AbstractBase):
@@ -83,17 +88,63 @@ class Post(AbstractBase):
         null=True,
         verbose_name='Категория'
     )
-    image = models.ImageField('Фото', upload_to='posts_images', blank=True)
+    image = models.ImageField(
+        'Фото',
+        upload_to='posts_images',
+        storage=post_image_storage,
+        blank=True,
+    )
+    comment_count = models.PositiveIntegerField(
+        'Количество комментариев',
+        default=0,
+        editable=False,
+    )
 
     class Meta:
         verbose_name = 'публикация'
         verbose_name_plural = 'Публикации'
         default_related_name = 'posts'
         ordering = ['-pub_date']
+        indexes = [
+            models.Index(
+                fields=['-pub_date', '-id'],
+                condition=models.Q(is_published=True),
+                name='post_published_feed_idx',
+            ),
+            models.Index(
+                fields=['category', '-pub_date', '-id'],
+                name='post_category_pub_date_idx',
+            ),
+            models.Index(
+                fields=['author', '-pub_date', '-id'],
+                name='post_author_pub_date_idx',
+            ),
+        ]
 
     def __str__(self):
         return self.title[:TITLE_LIMIT]
 
+    def image_variant_url(self, variant):
+        name = variant_name(self.image.name, variant)
+        if self.image.storage.exists(name):
+            return self.image.storage.url(name)
+        return self.image.url
+
+    @property
+    def image_card_url(self):
+        return self.image_variant_url('card')
+
+    @property
+    def image_detail_url(self):
+        return self.image_variant_url('detail')
+
+    @property
+    def image_srcset(self):
+        return ', '.join(
+            f'{self.image_variant_url(variant)} {width}w'
+            for variant, width in IMAGE_VARIANTS.items()
+        )
+
 
 class Comment(models.Model):
     text = models.TextField('Текст комментария')
@@ -107,3 +158,200 @@ class Comment(models.Model):
 
     class Meta:
         ordering = ['created_at']
+        indexes = [
+            models.Index(
+                fields=['post', 'created_at', 'id'],
+                name='comment_post_created_idx',
+            ),
+        ]
+
+
+class Task(models.Model):
+    class Status(models.TextChoices):
+        PENDING = 'pending', 'В очереди'
+        RUNNING = 'running', 'Выполняется'
+        DONE = 'done', 'Выполнена'
+        FAILED = 'failed', 'Ошибка'
+
+    name = models.CharField('Задача', max_length=64)
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='tasks',
+        verbose_name='Публикация',
+    )
+    status = models.CharField(
+        'Статус',
+        max_length=16,
+        choices=Status.choices,
+        default=Status.PENDING,
+    )
+    attempts = models.PositiveSmallIntegerField('Попыток', default=0)
+    last_error = models.TextField('Последняя ошибка', blank=True)
+    run_after = models.DateTimeField('Выполнить после', default=timezone.now)
+    created_at = models.DateTimeField('Добавлено', auto_now_add=True)
+    updated_at = models.DateTimeField('Изменено', auto_now=True)
+
+    class Meta:
+        verbose_name = 'фоновая задача'
+        verbose_name_plural = 'Фоновые задачи'
+        ordering = ['run_after', 'id']
+        indexes = [
+            models.Index(
+                fields=['status', 'run_after'],
+                name='task_status_run_after_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.name} #{self.post_id}'
+
+
+class SearchTerm(models.Model):
+    term = models.CharField('Термин', max_length=SEARCH_TERM_LENGTH)
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='search_terms',
+        verbose_name='Публикация',
+    )
+    weight = models.FloatField('Вес')
+
+    class Meta:
+        verbose_name = 'поисковый термин'
+        verbose_name_plural = 'Поисковые термины'
+        indexes = [
+            models.Index(
+                fields=['term', 'post'],
+                name='searchterm_term_post_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return self.term
+
+
+class AuthorStats(models.Model):
+    author = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='post_stats',
+        verbose_name='Автор',
+    )
+    total_posts = models.PositiveIntegerField('Всего публикаций', default=0)
+    published_posts = models.PositiveIntegerField(
+        'Опубликовано', default=0
+    )
+    comments_received = models.PositiveIntegerField(
+        'Комментариев к публикациям', default=0
+    )
+    last_post_date = models.DateTimeField(
+        'Последняя публикация', blank=True, null=True
+    )
+    next_pub_date = models.DateTimeField(
+        'Ближайшая отложенная публикация', blank=True, null=True
+    )
+
+    class Meta:
+        verbose_name = 'статистика автора'
+        verbose_name_plural = 'Статистика авторов'
+
+    def __str__(self):
+        return str(self.author)
+
+
+class ScheduledPublication(models.Model):
+    post = models.OneToOneField(
+        Post,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='scheduled_publication',
+        verbose_name='Публикация',
+    )
+    pub_date = models.DateTimeField('Дата и время публикации', db_index=True)
+
+    class Meta:
+        verbose_name = 'отложенная публикация'
+        verbose_name_plural = 'Отложенные публикации'
+        ordering = ['pub_date']
+
+    def __str__(self):
+        return f'{self.post_id} в {self.pub_date}'
+
+
+class FeedEntry(models.Model):
+    """Опубликованная публикация в опубликованной категории для ленты."""
+
+    post = models.OneToOneField(
+        Post,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='feed_entry',
+        verbose_name='Публикация',
+    )
+    pub_date = models.DateTimeField('Дата и время публикации')
+    category = models.ForeignKey(
+        Category,
+        on_delete=models.CASCADE,
+        db_index=False,
+        related_name='feed_entries',
+        verbose_name='Категория',
+    )
+    location = models.ForeignKey(
+        Location,
+        on_delete=models.SET_NULL,
+        blank=True,
+        null=True,
+        related_name='feed_entries',
+        verbose_name='Местоположение',
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='feed_entries',
+        verbose_name='Автор публикации',
+    )
+    author_username = models.CharField('Имя автора', max_length=150)
+    title = models.CharField('Заголовок', max_length=256)
+    excerpt = models.TextField('Начало текста')
+    image = models.CharField('Фото', max_length=100, blank=True)
+    comment_count = models.PositiveIntegerField(
+        'Количество комментариев', default=0
+    )
+
+    class Meta:
+        verbose_name = 'запись ленты'
+        verbose_name_plural = 'Лента'
+        indexes = [
+            models.Index(
+                fields=['-pub_date', '-post'],
+                name='feedentry_pub_date_idx',
+            ),
+            models.Index(
+                fields=['category', '-pub_date', '-post'],
+                name='feedentry_category_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return self.title[:TITLE_LIMIT]
+
+    def as_post(self):
+        """Публикация для карточки, собранная без запроса к blog_post."""
+        post = Post(
+            id=self.post_id,
+            title=self.title,
+            text=self.excerpt,
+            pub_date=self.pub_date,
+            image=self.image,
+            author_id=self.author_id,
+            category_id=self.category_id,
+            location_id=self.location_id,
+            comment_count=self.comment_count,
+            is_published=True,
+        )
+        Post.author.field.set_cached_value(
+            post, User(pk=self.author_id, username=self.author_username)
+        )
+        return post
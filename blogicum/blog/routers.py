@@ -0,0 +1,44 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+# Вне запросов (команды manage.py, планировщик, обработчик задач) чтения
+# идут в основную базу: эти процессы пишут по прочитанному, и отставшая
+# реплика подсунула бы им старые данные. На реплику читают только запросы,
+# которым это разрешил ReplicaStickinessMiddleware.
+_pinned_to_primary = ContextVar('blog_pinned_to_primary', default=True)
+
+
+@contextmanager
+def pinned_to_primary(pinned=True):
+    token = _pinned_to_primary.set(pinned)
+    try:
+        yield
+    finally:
+        _pinned_to_primary.reset(token)
+
+
+class ReadReplicaRouter:
+    """Читает модели блога с реплики, а пишет всегда в основную базу."""
+
+    app_label = 'blog'
+
+    def db_for_read(self, model, **hints):
+        if (model._meta.app_label != self.app_label
+                or not settings.READ_REPLICA_ALIAS
+                or _pinned_to_primary.get()):
+            return None
+        return settings.READ_REPLICA_ALIAS
+
+    def db_for_write(self, model, **hints):
+        if model._meta.app_label != self.app_label:
+            return None
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, settings.READ_REPLICA_ALIAS}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
@@ -0,0 +1,83 @@
+"""Отложенные публикации.
+
+Для каждой опубликованной записи с pub_date в будущем хранится строка
+ScheduledPublication. Планировщик (python manage.py run_scheduler)
+забирает наступившие строки и отправляет сигнал post_published ровно
+один раз на публикацию: строку удаляет и сигнал отправляет только тот
+процесс, чей DELETE её затронул. Удаление и отправка идут в одной
+транзакции, так что при ошибке получателя строка остаётся в расписании
+и сигнал отправляется повторно на следующем проходе.
+"""
+import logging
+
+from django.db import transaction
+from django.dispatch import Signal
+from django.utils import timezone
+
+from .models import Post, ScheduledPublication
+
+# Отправляется с аргументом post, когда наступает pub_date публикации.
+post_published = Signal()
+
+BATCH_SIZE = 100
+
+logger = logging.getLogger(__name__)
+
+
+def schedule_post(post):
+    if post.is_published and post.pub_date > timezone.now():
+        ScheduledPublication.objects.update_or_create(
+            post_id=post.pk, defaults={'pub_date': post.pub_date}
+        )
+    else:
+        ScheduledPublication.objects.filter(post_id=post.pk).delete()
+
+
+def rebuild_schedule():
+    ScheduledPublication.objects.all().delete()
+    ScheduledPublication.objects.bulk_create(
+        (
+            ScheduledPublication(post_id=pk, pub_date=pub_date)
+            for pk, pub_date in Post.objects.filter(
+                is_published=True, pub_date__gt=timezone.now()
+            ).values_list('pk', 'pub_date').iterator()
+        ),
+        batch_size=1000,
+    )
+    return ScheduledPublication.objects.count()
+
+
+def publish_due(now=None):
+    """Отправляет post_published для наступивших публикаций."""
+    now = now or timezone.now()
+    published = 0
+    due = ScheduledPublication.objects.filter(
+        pub_date__lte=now
+    ).values_list('pk', flat=True)
+    for pk in list(due[:BATCH_SIZE]):
+        try:
+            published += publish(pk, now)
+        except Exception:
+            logger.exception('Не удалось опубликовать запись #%s', pk)
+    return published
+
+
+@transaction.atomic
+def publish(pk, now):
+    claimed, _ = ScheduledPublication.objects.filter(
+        pk=pk, pub_date__lte=now
+    ).delete()
+    post = Post.objects.filter(pk=pk).first() if claimed else None
+    if post is None:
+        return 0
+    post_published.send(sender=Post, post=post)
+    return 1
+
+
+def seconds_until_next(now=None):
+    next_pub_date = ScheduledPublication.objects.values_list(
+        'pub_date', flat=True
+    ).first()
+    if next_pub_date is None:
+        return None
+    return max((next_pub_date - (now or timezone.now())).total_seconds(), 0)
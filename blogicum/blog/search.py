@@ -0,0 +1,204 @@
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.db import connections, router, transaction
+from django.db.models import Count, Sum
+
+from .models import SEARCH_TERM_LENGTH, Comment, Post, SearchTerm
+from .stemming import terms
+
+FTS_TABLE = 'blog_post_search'
+# Вес совпадения в заголовке, тексте и комментариях публикации.
+FIELD_WEIGHTS = (('title', 3.0), ('text', 1.0), ('comments', 0.5))
+REBUILD_BATCH_SIZE = 500
+# Значение limit для search_post_ids: все найденные публикации.
+NO_LIMIT = object()
+
+_fts5_tables = {}
+
+
+def use_fts5(using):
+    if settings.SEARCH_BACKEND == 'postings':
+        return False
+    if using not in _fts5_tables:
+        connection = connections[using]
+        _fts5_tables[using] = connection.vendor == 'sqlite' and (
+            FTS_TABLE in connection.introspection.table_names()
+        )
+    return _fts5_tables[using]
+
+
+def build_documents(posts):
+    """Термины заголовка, текста и комментариев для словарей публикаций."""
+    comments = defaultdict(list)
+    for post_id, text in Comment.objects.filter(
+        post_id__in=[post['pk'] for post in posts]
+    ).values_list('post_id', 'text'):
+        comments[post_id].append(text)
+    return {
+        post['pk']: {
+            'title': terms(post['title']),
+            'text': terms(post['text']),
+            'comments': terms(' '.join(comments[post['pk']])),
+        }
+        for post in posts
+    }
+
+
+def write_documents(post_ids, documents):
+    using = router.db_for_write(Post)
+    if use_fts5(using):
+        with connections[using].cursor() as cursor:
+            cursor.executemany(
+                f'DELETE FROM {FTS_TABLE} WHERE rowid = %s',
+                [[post_id] for post_id in post_ids],
+            )
+            cursor.executemany(
+                f'INSERT INTO {FTS_TABLE} (rowid, title, text, comments)'
+                ' VALUES (%s, %s, %s, %s)',
+                [
+                    [post_id] + [
+                        ' '.join(document[field])
+                        for field, _ in FIELD_WEIGHTS
+                    ]
+                    for post_id, document in documents.items()
+                ],
+            )
+        return
+    SearchTerm.objects.filter(post_id__in=post_ids).delete()
+    search_terms = []
+    for post_id, document in documents.items():
+        weights = Counter()
+        for field, weight in FIELD_WEIGHTS:
+            for term in document[field]:
+                weights[term[:SEARCH_TERM_LENGTH]] += weight
+        search_terms.extend(
+            SearchTerm(post_id=post_id, term=term, weight=weight)
+            for term, weight in weights.items()
+        )
+    SearchTerm.objects.bulk_create(search_terms, batch_size=1000)
+
+
+def index_post(post_id):
+    """Обновляет поисковый индекс одной публикации."""
+    posts = list(Post.objects.filter(pk=post_id).values('pk', 'title', 'text'))
+    write_documents([post_id], build_documents(posts))
+
+
+def index_comment(post_id, added='', removed=''):
+    """Переносит в индекс публикации изменение текста одного комментария.
+
+    Термины текста removed убираются из комментариев публикации, термины
+    текста added добавляются; остальные комментарии не перечитываются.
+    """
+    delta = Counter(terms(added))
+    delta.subtract(terms(removed))
+    delta = {term: count for term, count in delta.items() if count}
+    if not delta:
+        return
+    using = router.db_for_write(Post)
+    if use_fts5(using):
+        with connections[using].cursor() as cursor:
+            cursor.execute(
+                f'SELECT comments FROM {FTS_TABLE} WHERE rowid = %s',
+                [post_id],
+            )
+            row = cursor.fetchone()
+            if row is not None:
+                comments = Counter(row[0].split())
+                comments.update(delta)
+                cursor.execute(
+                    f'UPDATE {FTS_TABLE} SET comments = %s WHERE rowid = %s',
+                    [' '.join(comments.elements()), post_id],
+                )
+                return
+        index_post(post_id)
+        return
+    comment_weight = dict(FIELD_WEIGHTS)['comments']
+    weights = Counter()
+    for term, count in delta.items():
+        weights[term[:SEARCH_TERM_LENGTH]] += count * comment_weight
+    search_terms = {
+        search_term.term: search_term
+        for search_term in SearchTerm.objects.filter(
+            post_id=post_id, term__in=list(weights)
+        )
+    }
+    created, updated, deleted = [], [], []
+    for term, weight in weights.items():
+        search_term = search_terms.get(term)
+        if search_term is None:
+            if weight > 0:
+                created.append(
+                    SearchTerm(post_id=post_id, term=term, weight=weight)
+                )
+        elif search_term.weight + weight > 0:
+            search_term.weight += weight
+            updated.append(search_term)
+        else:
+            deleted.append(search_term.pk)
+    SearchTerm.objects.bulk_create(created)
+    SearchTerm.objects.bulk_update(updated, ['weight'])
+    SearchTerm.objects.filter(pk__in=deleted).delete()
+
+
+@transaction.atomic
+def rebuild_index():
+    using = router.db_for_write(Post)
+    if use_fts5(using):
+        with connections[using].cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE}')
+    else:
+        SearchTerm.objects.all().delete()
+    count = 0
+    last_pk = 0
+    while True:
+        posts = list(Post.objects.filter(pk__gt=last_pk).order_by(
+            'pk'
+        ).values('pk', 'title', 'text')[:REBUILD_BATCH_SIZE])
+        if not posts:
+            return count
+        write_documents([], build_documents(posts))
+        count += len(posts)
+        last_pk = posts[-1]['pk']
+
+
+def search_post_ids(query, limit=None):
+    """id публикаций, содержащих все слова запроса, от лучших к худшим.
+
+    По умолчанию их не больше SEARCH_MAX_RESULTS, с limit=NO_LIMIT — все.
+    """
+    query_terms = list(dict.fromkeys(
+        term[:SEARCH_TERM_LENGTH] for term in terms(query)
+    ))
+    if not query_terms:
+        return []
+    if limit is None:
+        limit = settings.SEARCH_MAX_RESULTS
+    using = router.db_for_read(Post)
+    if use_fts5(using):
+        match = ' AND '.join(
+            '"{}"'.format(term.replace('"', '""')) for term in query_terms
+        )
+        weights = ', '.join(str(weight) for _, weight in FIELD_WEIGHTS)
+        sql = (
+            f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s'
+            f' ORDER BY bm25({FTS_TABLE}, {weights}), rowid DESC'
+        )
+        params = [match]
+        if limit is not NO_LIMIT:
+            sql += ' LIMIT %s'
+            params.append(limit)
+        with connections[using].cursor() as cursor:
+            cursor.execute(sql, params)
+            return [row[0] for row in cursor.fetchall()]
+    post_ids = SearchTerm.objects.filter(
+        term__in=query_terms
+    ).values('post_id').annotate(
+        matched=Count('term'), score=Sum('weight')
+    ).filter(
+        matched=len(query_terms)
+    ).order_by('-score', '-post_id').values_list('post_id', flat=True)
+    if limit is not NO_LIMIT:
+        post_ids = post_ids[:limit]
+    return list(post_ids)
@@ -0,0 +1,115 @@
+import mimetypes
+import os
+import re
+
+from django.http import (FileResponse, Http404, HttpResponse,
+                         StreamingHttpResponse)
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+CHUNK_SIZE = 64 * 1024
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+
+def pick_encoding(request, full_path):
+    accepted = request.META.get('HTTP_ACCEPT_ENCODING', '')
+    for encoding, extension in ENCODINGS:
+        if encoding in accepted and os.path.isfile(full_path + extension):
+            return encoding, full_path + extension
+    return None, full_path
+
+
+def parse_range(header, size):
+    match = RANGE_RE.match(header.strip())
+    if not match or match.groups() == ('', ''):
+        return None
+    start, end = match.groups()
+    if start == '':
+        start, end = max(size - int(end), 0), size - 1
+    else:
+        start = int(start)
+        end = min(int(end), size - 1) if end else size - 1
+    if start > end or start >= size:
+        raise ValueError
+    return start, end
+
+
+def read_range(path, start, length):
+    with open(path, 'rb') as file:
+        file.seek(start)
+        while length > 0:
+            chunk = file.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+def file_response(request, file_path, size, etag, allow_range=True):
+    range_header = request.META.get('HTTP_RANGE')
+    if_range = request.META.get('HTTP_IF_RANGE')
+    byte_range = None
+    if allow_range and range_header and if_range in (None, etag):
+        try:
+            byte_range = parse_range(range_header, size)
+        except ValueError:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{size}'
+            return response
+    if byte_range is None:
+        response = FileResponse(open(file_path, 'rb'))
+        response['Content-Length'] = size
+        return response
+    start, end = byte_range
+    length = end - start + 1
+    response = StreamingHttpResponse(
+        read_range(file_path, start, length), status=206
+    )
+    response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    response['Content-Length'] = length
+    return response
+
+
+def serve_file(request, path, document_root, max_age=0, immutable=False):
+    """Отдаёт файл с ETag, Last-Modified, Range и сжатыми копиями.
+
+    Сжатые копии (.br, .gz), созданные при collectstatic, отдаются
+    клиентам, которые их принимают; диапазоны отдаются только для
+    несжатого файла.
+    """
+    try:
+        full_path = safe_join(document_root, path)
+    except ValueError:
+        raise Http404
+    if not os.path.isfile(full_path):
+        raise Http404
+    encoding, file_path = pick_encoding(request, full_path)
+    stat = os.stat(file_path)
+    etag = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+    last_modified = int(stat.st_mtime)
+
+    response = get_conditional_response(
+        request, etag=etag, last_modified=last_modified
+    )
+    if response is None:
+        response = file_response(
+            request, file_path, stat.st_size, etag,
+            allow_range=encoding is None,
+        )
+        if response.status_code == 416:
+            return response
+        content_type, _ = mimetypes.guess_type(full_path)
+        response['Content-Type'] = content_type or 'application/octet-stream'
+        if encoding:
+            response['Content-Encoding'] = encoding
+        response['Accept-Ranges'] = 'bytes'
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    cache_control = f'public, max-age={max_age}'
+    if immutable:
+        cache_control += ', immutable'
+    response['Cache-Control'] = cache_control
+    patch_vary_headers(response, ('Accept-Encoding',))
+    return response
@@ -0,0 +1,254 @@
+from contextvars import ContextVar
+from functools import partial
+
+from django.conf import settings
+from django.db import router, transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import (post_delete, post_save, pre_delete,
+                                      pre_save)
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .author_stats import (add_received_comments, apply_post_change,
+                           post_state, refresh_author_stats)
+from .caching import (bump_versions, category_page_scope, category_scope,
+                      feed_scope, invalidate_all_counts,
+                      invalidate_post_counts, location_scope, lookups_scope,
+                      pages_scope, post_scope, profile_page_scope,
+                      user_scope)
+from .feed import rename_author, sync_category, sync_post
+from .images import delete_variants
+from .models import AuthorStats, Category, Comment, Location, Post, User
+from .scheduler import post_published, schedule_post
+from .search import index_comment, index_post
+
+# Публикации, которые сейчас удаляются вместе с комментариями: сигналы
+# каскадно удаляемых комментариев для них пропускаются.
+_deleting_posts = ContextVar('deleting_posts', default=frozenset())
+
+
+@receiver(connection_created)
+def apply_sqlite_pragmas(sender, connection, **kwargs):
+    if connection.vendor != 'sqlite' or not settings.SQLITE_PRAGMAS:
+        return
+    with connection.cursor() as cursor:
+        for name, value in settings.SQLITE_PRAGMAS.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+
+
+def bump_post_pages(post_id, category_ids, author_id):
+    username = User.objects.filter(
+        pk=author_id
+    ).values_list('username', flat=True).first()
+    slugs = Category.objects.filter(
+        pk__in=[pk for pk in category_ids if pk is not None]
+    ).values_list('slug', flat=True)
+    bump_versions(
+        feed_scope(),
+        post_scope(post_id),
+        profile_page_scope(username),
+        *[category_page_scope(slug) for slug in slugs],
+    )
+
+
+def bump_lookups():
+    # Второй раз после фиксации транзакции: другой процесс мог успеть
+    # перечитать таблицы до неё и запомнить их под новой версией.
+    bump_versions(lookups_scope())
+    transaction.on_commit(lambda: bump_versions(lookups_scope()))
+
+
+def release_image(storage, name):
+    # Ссылки проверяются в основной базе: на реплике новой может ещё не быть.
+    if not name or Post.objects.using(
+        router.db_for_write(Post)
+    ).filter(image=name).exists():
+        return
+    storage.delete(name)
+    delete_variants(storage, name)
+
+
+@receiver(pre_save, sender=Post)
+def remember_previous_state(sender, instance, raw, **kwargs):
+    instance._previous_category_id = None
+    instance._previous_image = ''
+    instance._previous_state = None
+    if instance.pk and not raw:
+        instance._previous_state = post_state(instance.pk)
+        previous = Post.objects.filter(
+            pk=instance.pk
+        ).values_list('category_id', 'image').first()
+        if previous:
+            (instance._previous_category_id,
+             instance._previous_image) = previous
+
+
+@receiver(pre_delete, sender=Post)
+def remember_deleting_post(sender, instance, **kwargs):
+    _deleting_posts.set(_deleting_posts.get() | {instance.pk})
+    instance._previous_state = post_state(instance.pk)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def post_changed(sender, instance, **kwargs):
+    category_ids = [
+        instance.category_id,
+        getattr(instance, '_previous_category_id', None),
+    ]
+    invalidate_post_counts(category_ids)
+    bump_post_pages(instance.pk, category_ids, instance.author_id)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def update_author_stats(sender, instance, signal, raw=False, **kwargs):
+    if raw:
+        refresh_author_stats([instance.author_id])
+        return
+    apply_post_change(
+        getattr(instance, '_previous_state', None),
+        post_state(instance.pk) if signal is post_save else None,
+    )
+
+
+@receiver(post_save, sender=Post)
+def update_feed_entry(sender, instance, **kwargs):
+    sync_post(instance.pk)
+
+
+@receiver(post_save, sender=Post)
+def update_schedule(sender, instance, **kwargs):
+    schedule_post(instance)
+
+
+@receiver(post_published)
+def publication_went_live(sender, post, **kwargs):
+    invalidate_post_counts([post.category_id])
+    bump_post_pages(post.pk, [post.category_id], post.author_id)
+    refresh_author_stats([post.author_id])
+
+
+@receiver(post_save, sender=Post)
+def release_replaced_image(sender, instance, **kwargs):
+    previous_image = getattr(instance, '_previous_image', '')
+    if previous_image and previous_image != instance.image.name:
+        transaction.on_commit(
+            partial(release_image, instance.image.storage, previous_image)
+        )
+
+
+@receiver(post_delete, sender=Post)
+def release_deleted_image(sender, instance, **kwargs):
+    # После фиксации: при откате публикация и её файл должны уцелеть.
+    transaction.on_commit(
+        partial(release_image, instance.image.storage, instance.image.name)
+    )
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def comment_changed(sender, instance, **kwargs):
+    if instance.post_id in _deleting_posts.get():
+        return
+    post = Post.objects.filter(
+        pk=instance.post_id
+    ).values_list('category_id', 'author_id').first()
+    if post:
+        category_id, author_id = post
+        bump_post_pages(instance.post_id, [category_id], author_id)
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def count_received_comment(sender, instance, signal, created=True,
+                           **kwargs):
+    if not created or instance.post_id in _deleting_posts.get():
+        return
+    author_id = Post.objects.filter(
+        pk=instance.post_id,
+        is_published=True,
+        pub_date__lte=timezone.now(),
+        category__is_published=True,
+    ).values_list('author_id', flat=True).first()
+    if author_id:
+        add_received_comments(
+            author_id, 1 if signal is post_save else -1
+        )
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def update_post_search_index(sender, instance, **kwargs):
+    index_post(instance.pk)
+    _deleting_posts.set(_deleting_posts.get() - {instance.pk})
+
+
+@receiver(pre_save, sender=Comment)
+def remember_previous_text(sender, instance, raw, **kwargs):
+    instance._previous_text = ''
+    if instance.pk and not raw:
+        instance._previous_text = Comment.objects.filter(
+            pk=instance.pk
+        ).values_list('text', flat=True).first() or ''
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def update_comment_search_index(sender, instance, signal, **kwargs):
+    if instance.post_id in _deleting_posts.get():
+        return
+    if kwargs.get('raw'):
+        index_post(instance.post_id)
+    elif signal is post_save:
+        index_comment(
+            instance.post_id,
+            added=instance.text,
+            removed=getattr(instance, '_previous_text', ''),
+        )
+    else:
+        index_comment(instance.post_id, removed=instance.text)
+
+
+@receiver(pre_delete, sender=Category)
+def remember_category_authors(sender, instance, **kwargs):
+    # После удаления у публикаций категории category_id уже обнулён.
+    instance._author_ids = set(Post.objects.filter(
+        category=instance
+    ).values_list('author_id', flat=True))
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def category_changed(sender, instance, signal, **kwargs):
+    invalidate_all_counts()
+    bump_versions(category_scope(instance.pk), pages_scope())
+    bump_lookups()
+    if signal is post_save:
+        sync_category(instance.pk)
+    refresh_author_stats(getattr(instance, '_author_ids', None) or set(
+        Post.objects.filter(
+            category=instance
+        ).values_list('author_id', flat=True)
+    ))
+
+
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def location_changed(sender, instance, **kwargs):
+    bump_versions(location_scope(instance.pk), pages_scope())
+    bump_lookups()
+
+
+@receiver(post_save, sender=User)
+def create_author_stats(sender, instance, created, raw, **kwargs):
+    if created and not raw:
+        AuthorStats.objects.get_or_create(author=instance)
+
+
+@receiver(post_save, sender=User)
+def user_changed(sender, instance, created, update_fields=None, **kwargs):
+    if created or update_fields and set(update_fields) <= {'last_login'}:
+        return
+    bump_versions(user_scope(instance.pk), pages_scope())
+    rename_author(instance.pk, instance.username)
@@ -0,0 +1,118 @@
+"""Стеммер Snowball для русского языка и разбиение текста на термины."""
+import re
+from functools import lru_cache
+
+VOWELS = 'аеиоуыэюя'
+WORD_RE = re.compile(r'\w+')
+CYRILLIC_RE = re.compile(r'[а-я]')
+
+PERFECTIVE_GERUND = (
+    ('в', 'вши', 'вшись'),
+    ('ив', 'ивши', 'ившись', 'ыв', 'ывши', 'ывшись'),
+)
+REFLEXIVE = ((), ('ся', 'сь'))
+ADJECTIVE = ((), (
+    'ее', 'ие', 'ые', 'ое', 'ими', 'ыми', 'ей', 'ий', 'ый', 'ой', 'ем', 'им',
+    'ым', 'ом', 'его', 'ого', 'ему', 'ому', 'их', 'ых', 'ую', 'юю', 'ая',
+    'яя', 'ою', 'ею',
+))
+PARTICIPLE = (
+    ('ем', 'нн', 'вш', 'ющ', 'щ'),
+    ('ивш', 'ывш', 'ующ'),
+)
+VERB = (
+    ('ла', 'на', 'ете', 'йте', 'ли', 'й', 'л', 'ем', 'н', 'ло', 'но', 'ет',
+     'ют', 'ны', 'ть', 'ешь', 'нно'),
+    ('ила', 'ыла', 'ена', 'ейте', 'уйте', 'ите', 'или', 'ыли', 'ей', 'уй',
+     'ил', 'ыл', 'им', 'ым', 'ен', 'ило', 'ыло', 'ено', 'ят', 'ует', 'уют',
+     'ит', 'ыт', 'ены', 'ить', 'ыть', 'ишь', 'ую', 'ю'),
+)
+NOUN = ((), (
+    'а', 'ев', 'ов', 'ие', 'ье', 'е', 'иями', 'ями', 'ами', 'еи', 'ии', 'и',
+    'ией', 'ей', 'ой', 'ий', 'й', 'иям', 'ям', 'ием', 'ем', 'ам', 'ом', 'о',
+    'у', 'ах', 'иях', 'ях', 'ы', 'ь', 'ию', 'ью', 'ю', 'ия', 'ья', 'я',
+))
+SUPERLATIVE = ((), ('ейш', 'ейше'))
+DERIVATIONAL = ('ост', 'ость')
+
+STOP_WORDS = frozenset((
+    'а', 'без', 'бы', 'в', 'во', 'вот', 'все', 'всё', 'да', 'для', 'до',
+    'же', 'за', 'и', 'из', 'или', 'к', 'как', 'ко', 'ли', 'на', 'над', 'не',
+    'нет', 'ни', 'но', 'о', 'об', 'от', 'по', 'под', 'при', 'с', 'со', 'так',
+    'то', 'у', 'что', 'это',
+))
+
+
+def remove_ending(word, groups):
+    """Снимает самое длинное окончание; окончания первой группы — после а/я."""
+    with_vowel, plain = groups
+    for ending in sorted(with_vowel + plain, key=len, reverse=True):
+        if not word.endswith(ending):
+            continue
+        stem = word[:-len(ending)]
+        if ending in plain:
+            return stem
+        return stem if stem.endswith(('а', 'я')) else None
+    return None
+
+
+def region_start(word, start=0):
+    for index in range(start + 1, len(word)):
+        if word[index] not in VOWELS and word[index - 1] in VOWELS:
+            return index + 1
+    return len(word)
+
+
+def remove_inflection(rv):
+    result = remove_ending(rv, PERFECTIVE_GERUND)
+    if result is not None:
+        return result
+    rv = remove_ending(rv, REFLEXIVE) or rv
+    result = remove_ending(rv, ADJECTIVE)
+    if result is not None:
+        return remove_ending(result, PARTICIPLE) or result
+    result = remove_ending(rv, VERB)
+    if result is None:
+        result = remove_ending(rv, NOUN)
+    return rv if result is None else result
+
+
+def tidy_up(rv):
+    if rv.endswith('нн'):
+        return rv[:-1]
+    result = remove_ending(rv, SUPERLATIVE)
+    if result is not None:
+        return result[:-1] if result.endswith('нн') else result
+    return rv[:-1] if rv.endswith('ь') else rv
+
+
+@lru_cache(maxsize=100_000)
+def stem(word):
+    word = word.lower().replace('ё', 'е')
+    rv_start = next(
+        (index + 1 for index, char in enumerate(word) if char in VOWELS),
+        None,
+    )
+    if rv_start is None:
+        return word
+    prefix = word[:rv_start]
+    rv = remove_inflection(word[rv_start:])
+    if rv.endswith('и'):
+        rv = rv[:-1]
+    word = prefix + rv
+    r2_start = region_start(word, region_start(word))
+    for ending in DERIVATIONAL[::-1]:
+        if word.endswith(ending) and len(word) - len(ending) >= r2_start:
+            rv = rv[:-len(ending)]
+            break
+    return prefix + tidy_up(rv)
+
+
+def terms(text):
+    """Основы слов текста без стоп-слов, в порядке появления."""
+    result = []
+    for word in WORD_RE.findall(text.lower().replace('ё', 'е')):
+        if word in STOP_WORDS:
+            continue
+        result.append(stem(word) if CYRILLIC_RE.search(word) else word)
+    return result
@@ -0,0 +1,95 @@
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from .images import build_variants
+from .models import Task
+from .signals import bump_post_pages
+
+logger = logging.getLogger(__name__)
+
+
+def build_image_variants(post):
+    if post.image:
+        build_variants(post.image)
+
+
+TASKS = {
+    'build_image_variants': build_image_variants,
+}
+
+
+def enqueue_task(name, post):
+    if name not in TASKS:
+        raise ValueError(f'Неизвестная задача: {name}')
+    if settings.BLOG_TASKS_EAGER:
+        TASKS[name](post)
+        bump_task_pages(post)
+        return None
+    task, _ = Task.objects.get_or_create(
+        name=name, post=post, status=Task.Status.PENDING
+    )
+    return task
+
+
+def claim_task():
+    candidates = Task.objects.filter(
+        status=Task.Status.PENDING, run_after__lte=timezone.now()
+    ).values_list('pk', flat=True)
+    for pk in candidates[:10]:
+        claimed = Task.objects.filter(
+            pk=pk, status=Task.Status.PENDING
+        ).update(status=Task.Status.RUNNING, updated_at=timezone.now())
+        if claimed:
+            return Task.objects.select_related('post').get(pk=pk)
+    return None
+
+
+def run_task(task):
+    task.attempts += 1
+    try:
+        TASKS[task.name](task.post)
+    except Exception as error:
+        logger.exception('Задача %s завершилась с ошибкой', task)
+        task.last_error = f'{type(error).__name__}: {error}'
+        if task.attempts >= settings.BLOG_TASKS_MAX_ATTEMPTS:
+            task.status = Task.Status.FAILED
+        else:
+            task.status = Task.Status.PENDING
+            task.run_after = timezone.now() + timedelta(
+                seconds=settings.BLOG_TASKS_RETRY_DELAY
+                * 2 ** (task.attempts - 1)
+            )
+    else:
+        task.status = Task.Status.DONE
+        task.last_error = ''
+    task.save()
+    bump_task_pages(task.post)
+    return task
+
+
+def bump_task_pages(post):
+    # Результат задачи и её статус видны на страницах публикации.
+    bump_post_pages(post.pk, [post.category_id], post.author_id)
+
+
+def run_pending_tasks(limit=None):
+    done = 0
+    while limit is None or done < limit:
+        task = claim_task()
+        if task is None:
+            break
+        run_task(task)
+        done += 1
+    return done
+
+
+def requeue_stale_tasks():
+    stale_before = timezone.now() - timedelta(
+        seconds=settings.BLOG_TASKS_STALE_AFTER
+    )
+    return Task.objects.filter(
+        status=Task.Status.RUNNING, updated_at__lt=stale_before
+    ).update(status=Task.Status.PENDING)
@@ -0,0 +1,19 @@
+from django import template
+from django.conf import settings
+from django.core.cache import cache
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+from blog.caching import post_card_cache_key
+
+register = template.Library()
+
+
+@register.simple_tag
+def post_card(post):
+    key = post_card_cache_key(post)
+    html = cache.get(key)
+    if html is None:
+        html = render_to_string('includes/post_card.html', {'post': post})
+        cache.set(key, html, settings.POST_CARD_CACHE_TIMEOUT)
+    return mark_safe(html)
@@ -0,0 +1,20 @@
+from django.conf import settings
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+
+
+class SizeLimitedUploadHandler(TemporaryFileUploadHandler):
+    """Пишет загружаемые файлы на диск и не хранит больше лимита.
+
+    Байты сверх MAX_UPLOAD_SIZE отбрасываются по мере чтения, а размер
+    файла остаётся полным, чтобы форма могла отклонить загрузку.
+    """
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.received = 0
+
+    def receive_data_chunk(self, raw_data, start):
+        self.received += len(raw_data)
+        if self.received > settings.MAX_UPLOAD_SIZE:
+            return None
+        return super().receive_data_chunk(raw_data, start)
@@ -7,6 +7,7 @@ app_name = 'blog'
 posts_urls = [
     path('create/', views.PostCreateView.as_view(), name='create_post'),
     path('<int:pk>/', views.post_detail, name='post_detail'),
+    path('<int:pk>/comments/', views.post_comments, name='post_comments'),
     path('<int:pk>/edit/', views.PostUpdateView.as_view(), name='edit_post'),
     path('<int:pk>/delete/',
          views.PostDeleteView.as_view(), name='delete_post'),
@@ -26,6 +27,7 @@ profile_urls = [
 urlpatterns = [
     path('posts/', include(posts_urls)),
     path('profile/', include(profile_urls)),
+    path('search/', views.search, name='search'),
     path('category/<slug:category_slug>/',
          views.category_posts,
          name='category_posts'),
@@ -1,8 +1,157 @@
-from django.core.paginator import Paginator
+import base64
+import binascii
+from datetime import datetime
 
+from django.core.paginator import EmptyPage, Page, Paginator
+from django.db.models import Q
+from django.utils.functional import cached_property
 
-def paginate(request, queryset, items=10):
-    paginator = Paginator(queryset, items)
+CURSOR_PARAM = 'after'
+# Границы целочисленного первичного ключа в базе.
+CURSOR_PK_RANGE = range(-2 ** 63, 2 ** 63)
+
+
+def encode_cursor(value, pk):
+    raw = f'{value.isoformat()},{pk}'.encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        value, pk = base64.urlsafe_b64decode(padded).decode().split(',')
+        value, pk = datetime.fromisoformat(value), int(pk)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        return None
+    if value.tzinfo is None or pk not in CURSOR_PK_RANGE:
+        return None
+    return value, pk
+
+
+class CountedPaginator(Paginator):
+    """Paginator, который берёт общее число объектов у count_source.
+
+    Если число больше count_limit, оно лишь оценка: страницы за ней
+    остаются доступны, а есть ли следующая, выясняется по самой странице.
+    """
+
+    def __init__(self, object_list, per_page, count_source=None,
+                 count_limit=None, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.count_source = count_source
+        self.count_limit = count_limit
+
+    @cached_property
+    def count(self):
+        if self.count_source is None:
+            return super().count
+        return self.count_source()
+
+    @cached_property
+    def is_estimate(self):
+        return self.count_limit is not None and self.count > self.count_limit
+
+    def validate_number(self, number):
+        try:
+            return super().validate_number(number)
+        except EmptyPage:
+            if not self.is_estimate or int(number) < 1:
+                raise
+            return int(number)
+
+    def page(self, number):
+        if not self.is_estimate:
+            return super().page(number)
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        object_list = list(
+            self.object_list[bottom:bottom + self.per_page + 1]
+        )
+        if not object_list and number > 1:
+            raise EmptyPage('На этой странице нет результатов')
+        return EstimatedPage(
+            object_list[:self.per_page], number, self,
+            has_more=len(object_list) > self.per_page,
+        )
+
+    def get_page(self, number):
+        try:
+            return super().get_page(number)
+        except EmptyPage:
+            # За оценкой строк может не оказаться: как и за последней
+            # страницей без оценки, показывается последняя, где они точно есть.
+            return self.page(self.num_pages)
+
+
+class EstimatedPage(Page):
+
+    def __init__(self, object_list, number, paginator, has_more):
+        super().__init__(object_list, number, paginator)
+        self.has_more = has_more
+
+    def has_next(self):
+        return self.has_more
+
+
+class CursorPage:
+    """Страница, выбранная по курсору (значение поля, id) без OFFSET."""
+
+    paginator = None
+    number = None
+
+    def __init__(self, object_list, next_cursor, is_first):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.is_first = is_first
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return not self.is_first
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+def paginate_by_cursor(queryset, token, items=10, field='pub_date',
+                       descending=True):
+    direction = '-' if descending else ''
+    lookup = 'lt' if descending else 'gt'
+    queryset = queryset.order_by(f'{direction}{field}', f'{direction}pk')
+    cursor = decode_cursor(token) if token else None
+    if cursor is not None:
+        value, pk = cursor
+        queryset = queryset.filter(
+            Q(**{f'{field}__{lookup}': value})
+            | Q(**{field: value, f'pk__{lookup}': pk})
+        )
+    object_list = list(queryset[:items + 1])
+    next_cursor = None
+    if len(object_list) > items:
+        object_list = object_list[:items]
+        last = object_list[-1]
+        next_cursor = encode_cursor(getattr(last, field), last.pk)
+    return CursorPage(object_list, next_cursor, is_first=cursor is None)
+
+
+def paginate(request, queryset, items=10, count=None, count_limit=None):
+    if CURSOR_PARAM in request.GET:
+        return paginate_by_cursor(
+            queryset, request.GET.get(CURSOR_PARAM), items
+        )
+    paginator = CountedPaginator(
+        queryset, items, count_source=count, count_limit=count_limit
+    )
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
     return page_obj
@@ -1,66 +1,142 @@
+from django.contrib import admin
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.db.models import Count
+from django.core.paginator import Paginator
+from django.db import transaction
+from django.db.models import F, Value
+from django.db.models.functions import Greatest
+from django.http import Http404
 from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse
 from django.utils import timezone
+from django.utils.decorators import method_decorator
+from django.utils.http import urlencode
 from django.views.generic import CreateView, DeleteView, ListView, UpdateView
 
+from .author_stats import get_author_stats
+from .caching import (cache_anonymous_page, cached_count, category_page_scope,
+                      category_scope, conditional_page, count_limit,
+                      feed_scope, post_scope, profile_page_scope)
 from .forms import CommentForm, PostForm, UpdateUserForm
-from .models import Category, Comment, Post, User
-from .utils import paginate
+from .images import variants_exist
+from .instrumentation import REPORT_COLUMNS, collect_stats, summarize
+from .lookups import attach_lookups, category_by_slug, published_category_ids
+from .models import Comment, FeedEntry, Post, Task, User
+from .search import search_post_ids
+from .tasks import enqueue_task
+from .utils import CURSOR_PARAM, paginate, paginate_by_cursor
 
 NUMBER = 15
+COMMENTS_PER_PAGE = 50
 
 
-def index(request):
-    posts = Post.objects.select_related(
-        'category', 'author', 'location'
-    ).annotate(
-        comment_count=Count('comments')
-    ).order_by('-pub_date').filter(
-        is_published=True,
-        pub_date__lte=timezone.now(),
-        category__is_published=True,
+def posts_of_category(category_slug):
+    category = category_by_slug(category_slug)
+    if category is None:
+        return Post.objects.none()
+    return Post.objects.filter(category_id=category.pk)
+
+
+def feed_page(request, entries, scope):
+    page_obj = paginate(
+        request,
+        entries.order_by('-pub_date', '-pk'),
+        count=cached_count(scope, entries),
+        count_limit=count_limit(),
     )
-    page_obj = paginate(request, posts)
+    page_obj.object_list = attach_lookups(
+        entry.as_post() for entry in page_obj.object_list
+    )
+    return page_obj
+
+
+@conditional_page(lambda: [feed_scope()], lambda: FeedEntry.objects.all())
+@cache_anonymous_page(
+    lambda: [feed_scope()],
+    lambda: Post.objects.filter(category_id__in=published_category_ids()),
+)
+def index(request):
+    entries = FeedEntry.objects.filter(pub_date__lte=timezone.now())
+    page_obj = feed_page(request, entries, feed_scope())
     context = {'page_obj': page_obj}
     return render(request, 'blog/index.html', context)
 
 
+def get_visible_post(request, pk):
+    post = get_object_or_404(
+        Post.objects.select_related('category', 'author', 'location'),
+        pk=pk,
+    )
+    if post.author_id != request.user.id and not (
+        post.is_published
+        and post.pub_date <= timezone.now()
+        and post.category is not None
+        and post.category.is_published
+    ):
+        raise Http404
+    return post
+
+
+def get_comments_page(post, token=None):
+    return paginate_by_cursor(
+        post.comments.select_related('author'),
+        token,
+        COMMENTS_PER_PAGE,
+        field='created_at',
+        descending=False,
+    )
+
+
+@conditional_page(
+    lambda pk: [post_scope(pk)],
+    lambda pk: Post.objects.filter(pk=pk),
+)
+@cache_anonymous_page(lambda pk: [post_scope(pk)])
 def post_detail(request, pk):
-    post = get_object_or_404(Post, pk=pk)
-    if not request.user.is_authenticated or post.author != request.user:
-        post = get_object_or_404(
-            Post.objects.select_related('category', 'author', 'location'),
-            pk=pk,
-            pub_date__lte=timezone.now(),
-            is_published=True,
-            category__is_published=True,
-        )
+    post = get_visible_post(request, pk)
     form = CommentForm()
     context = {
         'post': post,
-        'comments': post.comments.all(
-        ).select_related().order_by('created_at'),
+        'comments': get_comments_page(post),
         'form': form,
     }
+    if (post.author_id == request.user.id and post.image
+            and not variants_exist(post.image)):
+        context['image_task'] = post.tasks.filter(
+            name='build_image_variants'
+        ).exclude(status=Task.Status.DONE).last()
     return render(request, 'blog/detail.html', context)
 
 
+@cache_anonymous_page(lambda pk: [post_scope(pk)])
+def post_comments(request, pk):
+    post = get_visible_post(request, pk)
+    context = {
+        'post': post,
+        'comments': get_comments_page(post, request.GET.get(CURSOR_PARAM)),
+    }
+    return render(request, 'includes/comment_list.html', context)
+
+
+@conditional_page(
+    lambda category_slug: [category_page_scope(category_slug)],
+    lambda category_slug: posts_of_category(category_slug).filter(
+        is_published=True
+    ),
+)
+@cache_anonymous_page(
+    lambda category_slug: [category_page_scope(category_slug)],
+    posts_of_category,
+)
 def category_posts(request, category_slug):
-    category = get_object_or_404(
-        Category,
-        slug=category_slug,
-        is_published=True)
-    posts = Post.objects.select_related(
-        'category', 'author', 'location'
-    ).filter(
-        category=category,
-        pub_date__lte=timezone.now(),
-        is_published=True,
-    ).order_by('-pub_date').annotate(comment_count=Count('comments'))
-    page_obj = paginate(request, posts)
+    category = category_by_slug(category_slug)
+    if category is None or not category.is_published:
+        raise Http404
+    entries = FeedEntry.objects.filter(
+        category_id=category.pk, pub_date__lte=timezone.now()
+    )
+    page_obj = feed_page(request, entries, category_scope(category.pk))
     context = {
         'page_obj': page_obj,
         'category': category
@@ -68,6 +144,36 @@ def category_posts(request, category_slug):
     return render(request, 'blog/category.html', context)
 
 
+def search(request):
+    query = request.GET.get('q', '').strip()
+    found_ids = search_post_ids(query) if query else []
+    visible_ids = set(Post.objects.filter(
+        pk__in=found_ids,
+        is_published=True,
+        pub_date__lte=timezone.now(),
+        category_id__in=published_category_ids(),
+    ).values_list('pk', flat=True))
+    page_obj = Paginator(
+        [pk for pk in found_ids if pk in visible_ids], 10
+    ).get_page(request.GET.get('page'))
+    posts = Post.objects.select_related('author').in_bulk(
+        page_obj.object_list
+    )
+    page_obj.object_list = attach_lookups(
+        posts[pk] for pk in page_obj.object_list
+    )
+    context = {
+        'query': query,
+        'page_obj': page_obj,
+        'page_prefix': urlencode({'q': query}) + '&' if query else '',
+    }
+    return render(request, 'blog/search.html', context)
+
+
+@method_decorator(conditional_page(
+    lambda username: [profile_page_scope(username)],
+    lambda username: Post.objects.filter(author__username=username),
+), name='dispatch')
 class UserListView(ListView):
     template_name = 'blog/profile.html'
     paginate_by = 10
@@ -76,34 +182,43 @@ class UserListView(ListView):
         self.author = get_object_or_404(
             User, username=self.kwargs['username']
         )
+        self.stats = get_author_stats(self.author)
+        posts = Post.objects.filter(author=self.author)
         if self.author == self.request.user:
-            return Post.objects.select_related(
-                'author',
-                'location',
-                'category'
-            ).filter(
-                author=self.author
-            ).order_by(
-                '-pub_date').annotate(comment_count=Count('comments'))
+            self.posts_count = self.stats.total_posts
         else:
-            return Post.objects.select_related(
-                'author',
-                'location',
-                'category'
-            ).filter(author=self.author,
-                     is_published=True,
-                     pub_date__lte=timezone.now(),
-                     category__is_published=True
-                     ).order_by('-pub_date').annotate(
-                comment_count=Count('comments'))
+            posts = posts.filter(
+                is_published=True,
+                pub_date__lte=timezone.now(),
+                category_id__in=published_category_ids(),
+            )
+            self.posts_count = self.stats.published_posts
+        return posts.select_related('author').order_by('-pub_date', '-id')
+
+    def paginate_queryset(self, queryset, page_size):
+        page = paginate(
+            self.request, queryset, page_size, count=lambda: self.posts_count
+        )
+        page.object_list = attach_lookups(page.object_list)
+        return page.paginator, page, page.object_list, page.has_other_pages()
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['profile'] = self.author
+        context['stats'] = self.stats
         return context
 
 
-class PostCreateView(LoginRequiredMixin, CreateView):
+class PostImageMixin:
+
+    def form_valid(self, form):
+        response = super().form_valid(form)
+        if 'image' in form.changed_data and self.object.image:
+            enqueue_task('build_image_variants', self.object)
+        return response
+
+
+class PostCreateView(LoginRequiredMixin, PostImageMixin, CreateView):
     model = Post
     form_class = PostForm
     template_name = 'blog/create.html'
@@ -121,7 +236,7 @@ class PostCreateView(LoginRequiredMixin, CreateView):
         )
 
 
-class PostUpdateView(LoginRequiredMixin, UpdateView):
+class PostUpdateView(LoginRequiredMixin, PostImageMixin, UpdateView):
     model = Post
     form_class = PostForm
     template_name = 'blog/create.html'
@@ -159,7 +274,14 @@ def add_comment(request, post_id):
         comment = form.save(commit=False)
         comment.author = request.user
         comment.post = post
-        comment.save()
+        with transaction.atomic():
+            comment.save()
+            Post.objects.filter(pk=post.pk).update(
+                comment_count=F('comment_count') + 1
+            )
+            FeedEntry.objects.filter(post_id=post.pk).update(
+                comment_count=F('comment_count') + 1
+            )
     return redirect('blog:post_detail', pk=post.id)
 
 
@@ -181,7 +303,14 @@ def comment_delete(request, post_id, comment_id):
                                 id=comment_id,
                                 author=request.user)
     if request.method == 'POST':
-        comment.delete()
+        with transaction.atomic():
+            comment.delete()
+            Post.objects.filter(pk=comment.post_id).update(
+                comment_count=Greatest(F('comment_count') - 1, Value(0))
+            )
+            FeedEntry.objects.filter(post_id=comment.post_id).update(
+                comment_count=Greatest(F('comment_count') - 1, Value(0))
+            )
         return redirect('blog:post_detail', pk=post_id)
     return render(request, 'blog/comment.html', {'comment': comment})
 
@@ -193,3 +322,14 @@ def user_profile_update(request):
         form.save()
         return redirect('blog:index')
     return render(request, 'blog/user.html', {'form': form})
+
+
+@staff_member_required
+def request_stats(request):
+    context = {
+        **admin.site.each_context(request),
+        'title': 'Статистика запросов',
+        'columns': [name for name, _ in REPORT_COLUMNS],
+        'rows': summarize(collect_stats()),
+    }
+    return render(request, 'admin/request_stats.html', context)
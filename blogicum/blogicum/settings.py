@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -25,11 +26,13 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'blog.middleware.InstrumentationMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'blog.middleware.ReplicaStickinessMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -40,7 +43,7 @@ TEMPLATES_DIR = BASE_DIR / 'templates'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'BACKEND': 'blog.instrumentation.InstrumentedTemplates',
         'DIRS': [TEMPLATES_DIR],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -64,6 +67,115 @@ DATABASES = {
     }
 }
 
+# Чтения публикаций и комментариев можно вынести на реплику: укажите путь
+# к файлу реплики в переменной окружения BLOGICUM_REPLICA_DB.
+READ_REPLICA_ALIAS = None
+
+if os.getenv('BLOGICUM_REPLICA_DB'):
+    READ_REPLICA_ALIAS = 'replica'
+    DATABASES[READ_REPLICA_ALIAS] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.getenv('BLOGICUM_REPLICA_DB'),
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ['blog.routers.ReadReplicaRouter']
+
+# Профиль настройки SQLite выбирается переменной BLOGICUM_SQLITE_PROFILE.
+# PRAGMA из профиля применяются к каждому новому соединению.
+SQLITE_PROFILES = {
+    'default': {},
+    'production': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'busy_timeout': 20000,
+        'mmap_size': 256 * 1024 * 1024,
+        'cache_size': -64 * 1024,
+        'temp_store': 'MEMORY',
+    },
+}
+
+SQLITE_PROFILE = os.getenv('BLOGICUM_SQLITE_PROFILE', 'default')
+
+SQLITE_PRAGMAS = SQLITE_PROFILES[SQLITE_PROFILE]
+
+if SQLITE_PROFILE == 'production':
+    for database in DATABASES.values():
+        database['CONN_MAX_AGE'] = 60
+    # WAL и параллельная запись не работают с базой в памяти,
+    # поэтому тесты в этом профиле идут на файловой базе.
+    DATABASES['default']['TEST'] = {'NAME': BASE_DIR / 'test_db.sqlite3'}
+
+REPLICA_STICKY_SECONDS = 10
+
+# По умолчанию у каждого процесса свой LocMemCache. Версии кеша, которые
+# поднимает один процесс, видят остальные только с общим кешем: задайте
+# BLOGICUM_CACHE_TABLE и создайте таблицу командой
+# python manage.py createcachetable.
+CACHE_TABLE = os.getenv('BLOGICUM_CACHE_TABLE')
+
+if CACHE_TABLE:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+            'LOCATION': CACHE_TABLE,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# Категории и местоположения держатся в памяти процесса и перечитываются
+# при смене их версии в кеше, но не реже раза в LOOKUP_TABLES_TIMEOUT
+# секунд: без общего кеша других процессов достигает только этот срок.
+LOOKUP_TABLES_TIMEOUT = 30
+
+# Число публикаций для пагинатора кешируется отдельно для ленты и каждой
+# категории и сбрасывается при изменении публикаций.
+# В режиме 'estimated' считается не больше POSTS_COUNT_ESTIMATE_LIMIT строк;
+# страницы за этим пределом открываются по ссылке «>>», без ссылки на
+# последнюю страницу.
+POSTS_COUNT_MODE = 'exact'
+
+POSTS_COUNT_ESTIMATE_LIMIT = 10000
+
+POSTS_COUNT_CACHE_TIMEOUT = 60
+
+# Отрисованные карточки публикаций кешируются по версиям публикации,
+# её категории, местоположения и автора.
+POST_CARD_CACHE_TIMEOUT = 60 * 60
+
+# Главная, страницы категорий и публикаций кешируются целиком для анонимных
+# посетителей; кеш истекает не позже ближайшей отложенной публикации.
+PAGE_CACHE_TIMEOUT = 60 * 5
+
+# Если запущен планировщик (python manage.py run_scheduler), кеш страниц и
+# статистика авторов сбрасываются в момент выхода отложенной публикации, и
+# срок кеша больше не ограничивается ближайшей pub_date. Действует только
+# с общим для процессов кешем (BLOGICUM_CACHE_TABLE).
+PUBLICATION_SCHEDULER = False
+
+# Число SQL-запросов, время БД, шаблонов и размер ответа замеряются для
+# каждого представления: отдаются в Server-Timing и копятся в памяти
+# процесса (последние REQUEST_STATS_SAMPLES замеров), а каждые
+# REQUEST_STATS_FLUSH_EVERY запросов сбрасываются в кеш.
+REQUEST_STATS_ENABLED = True
+
+REQUEST_STATS_SAMPLES = 1000
+
+REQUEST_STATS_FLUSH_EVERY = 100
+
+# Поиск по публикациям: в SQLite с FTS5 используется виртуальная таблица
+# blog_post_search, иначе (или при SEARCH_BACKEND = 'postings') —
+# обратный индекс в модели SearchTerm. Выдаётся не больше
+# SEARCH_MAX_RESULTS лучших результатов.
+SEARCH_BACKEND = 'fts5'
+
+SEARCH_MAX_RESULTS = 500
+
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -98,6 +210,20 @@ STATICFILES_DIRS = [
     BASE_DIR / 'static',
 ]
 
+STATIC_ROOT = BASE_DIR / 'static_root'
+
+# При BLOGICUM_OPTIMIZED_FILES=1 статика собирается с хешем в имени и
+# сжатыми копиями, а статика и медиа отдаются с ETag, Range и долгим
+# Cache-Control (см. blog.serving).
+OPTIMIZED_FILE_SERVING = os.getenv('BLOGICUM_OPTIMIZED_FILES') == '1'
+
+if OPTIMIZED_FILE_SERVING:
+    STATICFILES_STORAGE = 'blog.storage.CompressedManifestStaticFilesStorage'
+
+STATIC_MAX_AGE = 365 * 24 * 60 * 60
+
+MEDIA_MAX_AGE = 30 * 24 * 60 * 60
+
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
@@ -105,6 +231,30 @@ CSRF_FAILURE_VIEW = 'pages.views.csrf_failure'
 
 MEDIA_ROOT = BASE_DIR / 'media'
 
+MEDIA_URL = '/media/'
+
+# Загрузки сразу пишутся во временный файл на диске; всё, что сверх
+# MAX_UPLOAD_SIZE, отбрасывается при чтении. Изображения проверяются
+# по заголовку без полного декодирования.
+FILE_UPLOAD_HANDLERS = ['blog.uploadhandlers.SizeLimitedUploadHandler']
+
+MAX_UPLOAD_SIZE = 10 * 1024 * 1024
+
+MAX_IMAGE_PIXELS = 40_000_000
+
+ALLOWED_IMAGE_FORMATS = ('JPEG', 'PNG', 'GIF', 'WEBP')
+
+# Обработка изображений выполняется фоновыми задачами
+# (python manage.py run_tasks). При BLOG_TASKS_EAGER задачи выполняются
+# сразу в запросе.
+BLOG_TASKS_EAGER = False
+
+BLOG_TASKS_MAX_ATTEMPTS = 5
+
+BLOG_TASKS_RETRY_DELAY = 10
+
+BLOG_TASKS_STALE_AFTER = 10 * 60
+
 LOGIN_REDIRECT_URL = 'blog:index'
 
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
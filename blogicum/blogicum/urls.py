@@ -3,10 +3,14 @@ from django.conf.urls.static import static
 from django.contrib import admin
 from django.contrib.auth.forms import UserCreationForm
 from django.views.generic.edit import CreateView
-from django.urls import include, path, reverse_lazy
+from django.urls import include, path, re_path, reverse_lazy
+
+from blog.serving import serve_file
+from blog.views import request_stats
 
 
 urlpatterns = [
+    path('admin/request-stats/', request_stats, name='request_stats'),
     path('admin/', admin.site.urls),
     path('pages/', include('pages.urls', namespace='pages')),
     path(
@@ -20,7 +24,32 @@ urlpatterns = [
     ),
     path('auth/', include('django.contrib.auth.urls')),
     path('', include('blog.urls', namespace='blog')),
-] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+]
+
+if settings.OPTIMIZED_FILE_SERVING:
+    urlpatterns = [
+        re_path(
+            r'^{}(?P<path>.*)$'.format(settings.STATIC_URL.lstrip('/')),
+            serve_file,
+            {
+                'document_root': settings.STATIC_ROOT,
+                'max_age': settings.STATIC_MAX_AGE,
+                'immutable': True,
+            },
+        ),
+        re_path(
+            r'^{}(?P<path>.*)$'.format(settings.MEDIA_URL.lstrip('/')),
+            serve_file,
+            {
+                'document_root': settings.MEDIA_ROOT,
+                'max_age': settings.MEDIA_MAX_AGE,
+            },
+        ),
+    ] + urlpatterns
+else:
+    urlpatterns += static(
+        settings.MEDIA_URL, document_root=settings.MEDIA_ROOT
+    )
 
 handler403 = 'pages.views.csrf_failure'
 handler404 = 'pages.views.page_not_found'
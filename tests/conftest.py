@@ -19,6 +19,7 @@ from typing import (
 import pytest
 from django.apps import apps
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.db.models import Model, Field
 from django.forms import BaseForm
 from django.http import HttpResponse
@@ -41,6 +42,12 @@ def enable_debug_false():
         yield
 
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+
+
 class SafeImportFromContextManager:
     def __init__(
             self,
@@ -121,6 +128,13 @@ def user_client(user):
     return client
 
 
+@pytest.fixture
+def shared_cache(monkeypatch):
+    # LocMemCache тестов общий для сайта и команд: они в одном процессе.
+    from blog import caching
+    monkeypatch.setattr(caching, 'cache_is_shared', lambda: True)
+
+
 @pytest.fixture
 def unlogged_client(client):
     return client
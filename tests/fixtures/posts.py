@@ -6,6 +6,7 @@ import pytz
 from django.db.models import Model
 from django.forms import BaseForm
 from django.test import Client
+from django.utils import timezone
 from mixer.backend.django import Mixer
 
 from conftest import (
@@ -18,6 +19,18 @@ from conftest import (
 )
 
 
+@pytest.fixture
+def make_post(mixer: Mixer, user: Model, published_category):
+    def make(**kwargs):
+        kwargs.setdefault("author", user)
+        kwargs.setdefault("category", published_category)
+        kwargs.setdefault("is_published", True)
+        kwargs.setdefault("pub_date", timezone.now())
+        return mixer.blend("blog.Post", **kwargs)
+
+    return make
+
+
 @pytest.fixture
 def posts_with_unpublished_category(mixer: Mixer, user: Model):
     return mixer.cycle(N_PER_FIXTURE).blend(
@@ -0,0 +1,170 @@
+from datetime import timedelta
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from blog.author_stats import STATS_FIELDS, compute_stats, empty_stats
+from blog.models import AuthorStats, Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+def profile_stats(client, user):
+    response = client.get(f'/profile/{user.username}/')
+    assert response.status_code == HTTPStatus.OK
+    return response.context['stats'], response.context['page_obj']
+
+
+def test_profile_header_and_paginator_use_author_stats(
+        client, user, make_post
+):
+    make_post()
+    make_post(pub_date=timezone.now() - timedelta(days=1))
+    make_post(is_published=False)
+    make_post(pub_date=timezone.now() + timedelta(days=1))
+
+    stats, page_obj = profile_stats(client, user)
+    assert stats.published_posts == 2
+    assert stats.total_posts == 4
+    assert page_obj.paginator.count == 2, (
+        'Убедитесь, что пагинатор страницы пользователя берёт число'
+        ' публикаций из статистики автора.'
+    )
+    with CaptureQueriesContext(connection) as captured:
+        client.get(f'/profile/{user.username}/?page=1')
+    assert not any(
+        'COUNT(' in query['sql'] for query in captured.captured_queries
+    ), (
+        'Убедитесь, что на странице пользователя публикации не'
+        ' пересчитываются на каждый запрос.'
+    )
+
+
+def test_owner_paginator_counts_all_posts(user_client, user, make_post):
+    make_post()
+    make_post(is_published=False)
+    response = user_client.get(f'/profile/{user.username}/')
+    assert response.context['page_obj'].paginator.count == 2
+
+
+def test_stats_follow_post_and_comment_writes(
+        client, user_client, another_user_client, user, make_post
+):
+    post = make_post()
+    profile_stats(client, user)
+    make_post()
+    for text in ('Первый', 'Второй'):
+        another_user_client.post(
+            f'/posts/{post.id}/comment/', data={'text': text}
+        )
+    stats = AuthorStats.objects.get(author=user)
+    assert (stats.published_posts, stats.comments_received) == (2, 2), (
+        'Убедитесь, что статистика автора обновляется при добавлении'
+        ' публикаций и комментариев.'
+    )
+
+    Post.objects.filter(pk=post.pk).first().delete()
+    stats.refresh_from_db()
+    assert (stats.published_posts, stats.comments_received) == (1, 0)
+
+
+def stored_stats(user):
+    stats = AuthorStats.objects.get(author=user)
+    return {field: getattr(stats, field) for field in STATS_FIELDS}
+
+
+def test_post_writes_apply_deltas(user, another_user, make_post):
+    now = timezone.now()
+    with CaptureQueriesContext(connection) as captured:
+        first = make_post(pub_date=now - timedelta(days=2))
+        second = make_post(pub_date=now - timedelta(days=1))
+        scheduled = make_post(pub_date=now + timedelta(days=1))
+        make_post(pub_date=now + timedelta(days=2))
+        make_post(is_published=False)
+        Post.objects.filter(pk=second.pk).update(comment_count=3)
+        second.refresh_from_db()
+        second.is_published = False
+        second.save()
+        scheduled.pub_date = now - timedelta(hours=1)
+        scheduled.save()
+        first.author = another_user
+        first.save()
+        Post.objects.get(pk=scheduled.pk).delete()
+    assert not [
+        query['sql'] for query in captured.captured_queries
+        if 'GROUP BY' in query['sql']
+    ], (
+        'Убедитесь, что при сохранении и удалении публикации статистика'
+        ' автора меняется на разницу, а не пересчитывается целиком.'
+    )
+    for author in (user, another_user):
+        assert stored_stats(author) == compute_stats([author.pk]).get(
+            author.pk, empty_stats()
+        )
+
+
+def test_scheduled_post_is_counted_when_it_goes_live(
+        client, user, make_post
+):
+    post = make_post(pub_date=timezone.now() + timedelta(hours=1))
+    stats, _ = profile_stats(client, user)
+    assert stats.published_posts == 0
+    assert stats.next_pub_date == post.pub_date
+
+    Post.objects.filter(pk=post.pk).update(
+        pub_date=timezone.now() - timedelta(minutes=1)
+    )
+    AuthorStats.objects.filter(author=user).update(
+        next_pub_date=timezone.now() - timedelta(minutes=1)
+    )
+    stats, page_obj = profile_stats(client, user)
+    assert stats.published_posts == 1, (
+        'Убедитесь, что после выхода отложенной публикации статистика'
+        ' автора пересчитывается.'
+    )
+    assert stats.next_pub_date is None
+    assert len(page_obj) == 1
+
+
+def test_unpublishing_category_refreshes_stats(
+        client, user, make_post, published_category
+):
+    make_post()
+    profile_stats(client, user)
+    published_category.is_published = False
+    published_category.save()
+    assert AuthorStats.objects.get(author=user).published_posts == 0
+
+
+def test_author_can_be_deleted(client, user, make_post):
+    make_post()
+    profile_stats(client, user)
+    user.delete()
+    assert not AuthorStats.objects.exists()
+
+
+def test_rebuild_author_stats_repairs_rows(client, user, make_post):
+    make_post()
+    profile_stats(client, user)
+    AuthorStats.objects.update(published_posts=10)
+    out = StringIO()
+    call_command('rebuild_author_stats', '--check', stdout=out)
+    assert 'Расходящейся статистики: 1' in out.getvalue()
+
+    call_command('rebuild_author_stats', stdout=StringIO())
+    assert AuthorStats.objects.get(author=user).published_posts == 1
+
+
+def test_stats_are_computed_on_primary(settings, user, make_post):
+    make_post()
+    # Реплики в тестах нет: обращение к ней завершилось бы ошибкой.
+    settings.READ_REPLICA_ALIAS = 'replica'
+    assert compute_stats([user.pk])[user.pk]['published_posts'] == 1, (
+        'Убедитесь, что статистика авторов считается по основной базе,'
+        ' в которую она и записывается.'
+    )
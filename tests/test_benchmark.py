@@ -0,0 +1,66 @@
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from blog.models import Category, Comment, Post, User
+
+pytestmark = [pytest.mark.django_db]
+
+
+def seed(**options):
+    call_command(
+        'seed_benchmark', users=5, categories=3, locations=3, posts=60,
+        comments=300, stdout=StringIO(), **options
+    )
+
+
+def test_seed_benchmark_creates_dataset():
+    seed(hot_share=0.05, scheduled_share=0.2)
+    assert User.objects.filter(username__startswith='bench_user_').count() == 5
+    assert Category.objects.count() == 3
+    assert Post.objects.count() == 60
+    assert Comment.objects.count() == 300
+    assert Post.objects.filter(pub_date__gt=timezone.now()).exists(), (
+        'Убедитесь, что среди созданных публикаций есть отложенные.'
+    )
+    output = StringIO()
+    call_command('recount_comments', check=True, stdout=output)
+    assert 'Расходящихся счётчиков: 0' in output.getvalue(), (
+        'Убедитесь, что у созданных публикаций заполнен счётчик комментариев.'
+    )
+    top = Post.objects.order_by('-comment_count')[:3]
+    assert sum(post.comment_count for post in top) >= 100, (
+        'Убедитесь, что большая часть комментариев достаётся «горячим»'
+        ' публикациям.'
+    )
+
+    seed(clear=True)
+    assert User.objects.filter(username__startswith='bench_user_').count() == 5
+    assert Post.objects.count() == 60
+
+
+def test_bench_requests_reports_endpoints(tmp_path):
+    seed()
+    output = tmp_path / 'bench.json'
+    stdout = StringIO()
+    call_command(
+        'bench_requests', requests=40, concurrency=1, output=str(output),
+        stdout=stdout,
+    )
+    report = json.loads(output.read_text(encoding='utf-8'))
+    assert report['requests'] == 40
+    assert report['rps'] > 0
+    assert 'blog:post_detail' in report['endpoints']
+    for row in report['endpoints'].values():
+        assert row['errors'] == 0
+        assert row['p50'] <= row['p95'] <= row['p99'] <= row['max']
+
+    stdout = StringIO()
+    call_command(
+        'bench_requests', requests=10, concurrency=1,
+        baseline=str(output), stdout=stdout,
+    )
+    assert f'было {report["rps"]} RPS' in stdout.getvalue()
@@ -0,0 +1,74 @@
+import io
+import json
+from datetime import datetime, timezone
+from io import StringIO
+
+import pytest
+from django.conf import settings
+from django.core.management import call_command
+from django.db import connection
+
+from blog.management.commands.bulk_loaddata import iter_json_array
+from blog.models import Category, Comment, Location, Post, User
+
+DB_JSON = settings.BASE_DIR / 'db.json'
+
+
+def load(path, *args):
+    output = StringIO()
+    call_command('bulk_loaddata', str(path), *args, stdout=output)
+    return output.getvalue()
+
+
+def test_iter_json_array_reads_in_chunks():
+    objects = json.loads(DB_JSON.read_text(encoding='utf-8'))
+    with open(DB_JSON, encoding='utf-8') as file:
+        streamed = list(iter_json_array(file, chunk_size=100))
+    assert streamed == objects
+    assert list(iter_json_array(io.StringIO(' [ ] '))) == []
+
+
+@pytest.mark.django_db
+def test_loads_repository_dump():
+    output = load(DB_JSON)
+    assert User.objects.count() == 4
+    assert Category.objects.count() == 6
+    assert Location.objects.count() == 12
+    assert Post.objects.count() == 39
+    assert 'Пропущено admin.logentry: 75' in output
+    post = Post.objects.get(pk=1)
+    assert post.created_at == datetime(
+        2022, 12, 18, 23, 6, 18, 993000, tzinfo=timezone.utc
+    ), 'Убедитесь, что даты создания переносятся из файла без изменений.'
+    assert post.author_id == 3 and post.category_id == 4
+
+
+@pytest.mark.django_db
+def test_comment_counts_recounted(tmp_path):
+    objects = [
+        {'model': 'blog.comment', 'pk': number, 'fields': {
+            'text': 'Комментарий', 'post': 1, 'author': 1,
+            'created_at': '2022-12-19T10:00:00Z',
+        }}
+        for number in range(1, 4)
+    ] + json.loads(DB_JSON.read_text(encoding='utf-8'))
+    fixture = tmp_path / 'dump.json'
+    fixture.write_text(json.dumps(objects), encoding='utf-8')
+    load(fixture, '--batch-size', '2')
+    assert Comment.objects.count() == 3
+    assert Post.objects.get(pk=1).comment_count == 3, (
+        'Убедитесь, что после загрузки пересчитываются счётчики комментариев.'
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_indexes_rebuilt_after_load():
+    load(DB_JSON, '--drop-indexes')
+    with connection.cursor() as cursor:
+        constraints = connection.introspection.get_constraints(
+            cursor, Post._meta.db_table
+        )
+    for index in Post._meta.indexes:
+        assert index.name in constraints, (
+            'Убедитесь, что индексы восстанавливаются после загрузки.'
+        )
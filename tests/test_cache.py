@@ -0,0 +1,115 @@
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from blog.caching import page_cache_timeout
+from blog.models import Post
+
+pytestmark = [pytest.mark.django_db]
+
+POST_CARD_TEMPLATE = 'includes/post_card.html'
+
+
+def rendered_templates(response):
+    return [template.name for template in response.templates]
+
+
+def test_post_card_rendered_from_cache(
+        user_client, post_with_published_location
+):
+    response = user_client.get('/')
+    assert POST_CARD_TEMPLATE in rendered_templates(response)
+    response = user_client.get('/')
+    assert POST_CARD_TEMPLATE not in rendered_templates(response), (
+        'Убедитесь, что карточка публикации при повторном показе берётся из'
+        ' кеша, а не отрисовывается заново.'
+    )
+    assert post_with_published_location.title in response.content.decode()
+
+
+@pytest.mark.parametrize('change', ['post', 'category', 'location', 'author'])
+def test_post_card_cache_invalidated(
+        user_client, post_with_published_location, change
+):
+    post = post_with_published_location
+    user_client.get('/')
+    new_value = 'Обновлённое значение'
+    if change == 'post':
+        post.title = new_value
+        post.save()
+    elif change == 'category':
+        post.category.title = new_value
+        post.category.save()
+    elif change == 'location':
+        post.location.name = new_value
+        post.location.save()
+    else:
+        post.author.username = 'renamed_author'
+        post.author.save()
+        new_value = '@renamed_author'
+    content = user_client.get('/').content.decode()
+    assert new_value in content, (
+        'Убедитесь, что кеш карточки публикации сбрасывается при изменении'
+        f' связанного объекта: {change}.'
+    )
+
+
+def blog_queries(captured):
+    return [
+        query['sql'] for query in captured.captured_queries
+        if 'blog_' in query['sql']
+    ]
+
+
+@pytest.mark.parametrize('url_template', [
+    '/',
+    '/category/{post.category.slug}/',
+    '/posts/{post.id}/',
+])
+def test_anonymous_page_cached_and_invalidated(
+        client, post_with_published_location, url_template
+):
+    post = post_with_published_location
+    url = url_template.format(post=post)
+    client.get(url)
+    with CaptureQueriesContext(connection) as captured:
+        response = client.get(url)
+    assert response.status_code == 200
+    assert not blog_queries(captured), (
+        f'Убедитесь, что страница `{url}` для анонимного посетителя'
+        ' отдаётся из кеша без запросов к базе данных.'
+    )
+
+    post.title = 'Новый заголовок'
+    post.save()
+    assert 'Новый заголовок' in client.get(url).content.decode(), (
+        f'Убедитесь, что кеш страницы `{url}` сбрасывается при изменении'
+        ' публикации.'
+    )
+
+
+def test_anonymous_page_cache_invalidated_by_comment(
+        client, mixer, user, post_with_published_location
+):
+    post = post_with_published_location
+    url = f'/posts/{post.id}/'
+    client.get(url)
+    mixer.blend('blog.Comment', post=post, author=user, text='Свежий отзыв')
+    assert 'Свежий отзыв' in client.get(url).content.decode()
+
+
+def test_page_cache_expires_at_next_scheduled_post(
+        mixer, user, published_category
+):
+    mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        is_published=True, pub_date=timezone.now() + timedelta(seconds=30),
+    )
+    timeout = page_cache_timeout(Post.objects.all())
+    assert 0 < timeout <= 30, (
+        'Убедитесь, что кеш страницы истекает не позже даты ближайшей'
+        ' отложенной публикации.'
+    )
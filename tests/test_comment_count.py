@@ -0,0 +1,53 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+
+from blog.models import Comment, Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_comment_count_follows_comment_views(
+        user_client, post_with_published_location
+):
+    post = post_with_published_location
+    url = f'/posts/{post.id}/comment/'
+    for text in ('Первый', 'Второй'):
+        response = user_client.post(url, data={'text': text})
+        assert response.status_code == HTTPStatus.FOUND
+    post.refresh_from_db()
+    assert post.comment_count == 2, (
+        'Убедитесь, что при добавлении комментария увеличивается счётчик'
+        ' `comment_count` публикации.'
+    )
+
+    comment = Comment.objects.filter(post=post).first()
+    user_client.post(f'/posts/{post.id}/delete_comment/{comment.id}/')
+    post.refresh_from_db()
+    assert post.comment_count == 1, (
+        'Убедитесь, что при удалении комментария уменьшается счётчик'
+        ' `comment_count` публикации.'
+    )
+
+
+def test_recount_comments_repairs_counters(mixer, comment_to_a_post):
+    post = Post.objects.get()
+    Post.objects.update(comment_count=10)
+    call_command('recount_comments')
+    post.refresh_from_db()
+    assert post.comment_count == 1
+
+
+def test_deleting_comment_keeps_counter_non_negative(
+        user_client, post_with_published_location
+):
+    post = post_with_published_location
+    user_client.post(f'/posts/{post.id}/comment/', data={'text': 'Текст'})
+    comment = Comment.objects.get(post=post)
+    Post.objects.update(comment_count=0)
+    user_client.post(f'/posts/{post.id}/delete_comment/{comment.id}/')
+    post.refresh_from_db()
+    assert post.comment_count == 0, (
+        'Убедитесь, что счётчик `comment_count` не уходит ниже нуля.'
+    )
@@ -0,0 +1,129 @@
+import time
+from http import HTTPStatus
+
+import pytest
+
+from blog import caching
+
+pytestmark = [pytest.mark.django_db]
+
+URL_TEMPLATES = [
+    '/',
+    '/category/{post.category.slug}/',
+    '/profile/{post.author.username}/',
+    '/posts/{post.id}/',
+]
+
+
+def get_url(url_template, post):
+    return url_template.format(post=post)
+
+
+class Clock:
+
+    def __init__(self):
+        self.now = time.time()
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds=2):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(caching, 'clock', clock)
+    return clock
+
+
+@pytest.mark.parametrize('url_template', URL_TEMPLATES)
+def test_not_modified_without_rendering(
+        user_client, clock, post_with_published_location, url_template
+):
+    url = get_url(url_template, post_with_published_location)
+    clock.advance()
+    response = user_client.get(url)
+    assert response.status_code == HTTPStatus.OK
+    assert response.has_header('ETag') and response.has_header(
+        'Last-Modified'
+    ), f'Убедитесь, что страница `{url}` отдаёт ETag и Last-Modified.'
+
+    for headers in (
+        {'HTTP_IF_NONE_MATCH': response['ETag']},
+        {'HTTP_IF_MODIFIED_SINCE': response['Last-Modified']},
+    ):
+        repeated = user_client.get(url, **headers)
+        assert repeated.status_code == HTTPStatus.NOT_MODIFIED, (
+            f'Убедитесь, что страница `{url}` отвечает 304 Not Modified,'
+            ' если с прошлого запроса ничего не изменилось.'
+        )
+        assert not repeated.templates, (
+            'Убедитесь, что для ответа 304 страница не отрисовывается.'
+        )
+
+
+@pytest.mark.parametrize('url_template', URL_TEMPLATES)
+@pytest.mark.parametrize('change', ['comment', 'post'])
+def test_validators_change(
+        user_client, mixer, user, post_with_published_location,
+        url_template, change
+):
+    post = post_with_published_location
+    url = get_url(url_template, post)
+    etag = user_client.get(url)['ETag']
+    if change == 'comment':
+        mixer.blend('blog.Comment', post=post, author=user)
+    else:
+        post.title = 'Обновлённый заголовок'
+        post.save()
+    response = user_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK, (
+        f'Убедитесь, что ETag страницы `{url}` меняется при изменении'
+        f' связанного объекта: {change}.'
+    )
+    assert response['ETag'] != etag
+
+
+@pytest.mark.parametrize('url_template', URL_TEMPLATES)
+@pytest.mark.parametrize('change', ['comment', 'post', 'deleted_comment'])
+def test_last_modified_moves_forward(
+        user_client, clock, mixer, user, post_with_published_location,
+        url_template, change
+):
+    post = post_with_published_location
+    url = get_url(url_template, post)
+    comment = mixer.blend('blog.Comment', post=post, author=user)
+    clock.advance()
+    last_modified = user_client.get(url)['Last-Modified']
+    clock.advance()
+    if change == 'comment':
+        mixer.blend('blog.Comment', post=post, author=user)
+    elif change == 'post':
+        post.title = 'Обновлённый заголовок'
+        post.save()
+    else:
+        comment.delete()
+    clock.advance()
+    response = user_client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+    assert response.status_code == HTTPStatus.OK, (
+        f'Убедитесь, что Last-Modified страницы `{url}` сдвигается вперёд'
+        f' при изменении связанного объекта: {change}.'
+    )
+    assert response['Last-Modified'] != last_modified
+
+
+def test_last_modified_withheld_in_the_second_of_change(
+        user_client, clock, post_with_published_location
+):
+    url = f'/posts/{post_with_published_location.id}/'
+    clock.advance()
+    assert user_client.get(url).has_header('Last-Modified')
+    post_with_published_location.title = 'Обновлённый заголовок'
+    post_with_published_location.save()
+    assert not user_client.get(url).has_header('Last-Modified'), (
+        'Убедитесь, что Last-Modified не отдаётся в ту же секунду, когда'
+        ' страница изменилась: второе изменение в эту секунду его бы не'
+        ' сдвинуло.'
+    )
@@ -0,0 +1,112 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.template.defaultfilters import truncatewords
+from django.test.utils import CaptureQueriesContext
+
+from blog.models import FeedEntry
+
+pytestmark = [pytest.mark.django_db]
+
+
+def feed_ids(client, url='/'):
+    return [post.id for post in client.get(url).context['page_obj']]
+
+
+@pytest.mark.parametrize('url_template', [
+    '/', '/category/{post.category.slug}/'
+])
+def test_feed_reads_single_table(
+        user_client, post_with_published_location, url_template
+):
+    url = url_template.format(post=post_with_published_location)
+    user_client.get(url)
+    with CaptureQueriesContext(connection) as captured:
+        response = user_client.get(f'{url}?page=1')
+    post = response.context['page_obj'][0]
+    assert post == post_with_published_location
+    assert post.author.username == post_with_published_location.author.username
+    assert not [
+        query['sql'] for query in captured.captured_queries
+        if 'FROM "blog_post"' in query['sql'] or 'JOIN' in query['sql']
+    ], (
+        'Убедитесь, что главная страница и страницы категорий читают'
+        ' публикации из таблицы ленты без соединений с другими таблицами.'
+    )
+
+
+def test_feed_follows_post_category_and_author_changes(
+        user_client, user, post_with_published_location
+):
+    post = post_with_published_location
+    post.title = 'Новый заголовок'
+    post.save()
+    assert FeedEntry.objects.get(post=post).title == 'Новый заголовок'
+
+    post.is_published = False
+    post.save()
+    assert feed_ids(user_client) == []
+
+    post.is_published = True
+    post.save()
+    category = post.category
+    category.is_published = False
+    category.save()
+    assert not FeedEntry.objects.exists(), (
+        'Убедитесь, что публикации снятой с публикации категории убираются'
+        ' из ленты.'
+    )
+    category.is_published = True
+    category.save()
+    assert feed_ids(user_client, '/?page=1') == [post.id]
+
+    user.username = 'renamed'
+    user.save()
+    assert FeedEntry.objects.get(post=post).author_username == 'renamed'
+
+    user_client.post(f'/posts/{post.id}/comment/', data={'text': 'Текст'})
+    assert FeedEntry.objects.get(post=post).comment_count == 1
+
+
+def test_feed_excerpt_matches_post_card(
+        user_client, post_with_published_location
+):
+    post = post_with_published_location
+    post.text = ' '.join(f'слово{number}' for number in range(20))
+    post.save()
+    assert FeedEntry.objects.get(post=post).excerpt == truncatewords(
+        post.text, 10
+    ), (
+        'Убедитесь, что начало текста в ленте обрезается так же, как'
+        ' фильтром truncatewords в карточке публикации.'
+    )
+
+
+def test_feed_comment_count_stays_non_negative(
+        user_client, post_with_published_location
+):
+    post = post_with_published_location
+    user_client.post(f'/posts/{post.id}/comment/', data={'text': 'Текст'})
+    comment = post.comments.get()
+    FeedEntry.objects.update(comment_count=0)
+    user_client.post(f'/posts/{post.id}/delete_comment/{comment.id}/')
+    assert FeedEntry.objects.get(post=post).comment_count == 0, (
+        'Убедитесь, что счётчик комментариев в ленте не уходит ниже нуля.'
+    )
+
+
+def test_check_feed_repairs_differences(
+        post_with_published_location, post_of_another_author
+):
+    FeedEntry.objects.filter(post=post_with_published_location).delete()
+    FeedEntry.objects.update(title='Устарело')
+    out = StringIO()
+    call_command('check_feed', stdout=out)
+    assert 'Не хватает: 1, лишних: 0, устаревших: 1' in out.getvalue()
+
+    call_command('check_feed', '--repair', stdout=StringIO())
+    out = StringIO()
+    call_command('check_feed', stdout=out)
+    assert 'Не хватает: 0, лишних: 0, устаревших: 0' in out.getvalue()
@@ -0,0 +1,113 @@
+from io import BytesIO
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.utils import timezone
+from PIL import Image
+
+from blog.images import IMAGE_VARIANTS, variant_name
+from blog.models import Post, Task
+from blog import tasks
+from blog.tasks import enqueue_task, run_pending_tasks
+
+pytestmark = [pytest.mark.django_db]
+
+
+def make_image_file(name='photo.png', size=(2000, 1500)):
+    buffer = BytesIO()
+    Image.new('RGB', size, color='orange').save(buffer, 'PNG')
+    return SimpleUploadedFile(name, buffer.getvalue(), 'image/png')
+
+
+def assert_variants(post):
+    storage = post.image.storage
+    for variant, width in IMAGE_VARIANTS.items():
+        name = variant_name(post.image.name, variant)
+        assert storage.exists(name), (
+            f'Убедитесь, что для изображения создаётся вариант `{variant}`.'
+        )
+        with storage.open(name) as file, Image.open(file) as image:
+            assert image.width == width
+
+
+def test_variants_built_on_upload(user_client, published_category):
+    response = user_client.post('/posts/create/', data={
+        'title': 'С картинкой',
+        'is_published': True,
+        'text': 'Текст',
+        'pub_date': timezone.localtime().strftime('%Y-%m-%d %H:%M'),
+        'category': published_category.id,
+        'image': make_image_file(),
+    })
+    assert response.status_code == 302
+    post = Post.objects.get(title='С картинкой')
+    assert post.tasks.filter(status=Task.Status.PENDING).exists(), (
+        'Убедитесь, что обработка изображения ставится в очередь фоновых'
+        ' задач, а не выполняется во время запроса.'
+    )
+    detail = user_client.get(f'/posts/{post.id}/').content.decode()
+    assert 'Изображение обрабатывается' in detail
+
+    call_command('run_tasks', '--once')
+    assert_variants(post)
+
+    content = user_client.get('/').content.decode()
+    assert post.image_card_url in content and 'srcset=' in content, (
+        'Убедитесь, что в карточке публикации выводится уменьшенный вариант'
+        ' изображения и атрибут `srcset`.'
+    )
+
+
+def test_build_image_variants_command(mixer, user, published_category):
+    post = mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        image=make_image_file(),
+    )
+    post.save()
+    call_command('build_image_variants')
+    assert_variants(post)
+
+
+def test_failed_task_is_retried_then_marked_failed(
+        settings, mixer, user, published_category
+):
+    settings.BLOG_TASKS_MAX_ATTEMPTS = 2
+    settings.BLOG_TASKS_RETRY_DELAY = 0
+    post = mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        image=SimpleUploadedFile('broken.png', b'not an image'),
+    )
+    task = enqueue_task('build_image_variants', post)
+
+    run_pending_tasks()
+    task.refresh_from_db()
+    assert task.status == Task.Status.FAILED, (
+        'Убедитесь, что задача с ошибкой повторяется и после исчерпания'
+        ' попыток получает статус «Ошибка».'
+    )
+    assert task.attempts == 2
+    assert task.last_error
+
+
+@pytest.mark.parametrize('eager', [True, False])
+def test_finished_task_bumps_post_pages_once(
+        settings, monkeypatch, mixer, user, published_category, eager
+):
+    post = mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        image=make_image_file(),
+    )
+    bumped = []
+    monkeypatch.setattr(
+        tasks, 'bump_post_pages',
+        lambda post_id, *args: bumped.append(post_id),
+    )
+    settings.BLOG_TASKS_EAGER = eager
+    enqueue_task('build_image_variants', post)
+    run_pending_tasks()
+    assert_variants(post)
+    assert bumped == [post.pk], (
+        'Убедитесь, что после обработки изображения страницы публикации'
+        ' сбрасываются из кеша ровно один раз.'
+    )
@@ -0,0 +1,45 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+pytestmark = [pytest.mark.django_db]
+
+INDEXED_TABLES = ('blog_post', 'blog_comment')
+
+
+def get_table_scans(sql):
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+        plan = [row[-1] for row in cursor.fetchall()]
+    return [
+        line for line in plan
+        if line.split()[:1] == ['SCAN']
+        and line.split()[-1] in INDEXED_TABLES
+    ]
+
+
+@pytest.mark.skipif(
+    connection.vendor != 'sqlite', reason='EXPLAIN QUERY PLAN есть в SQLite'
+)
+@pytest.mark.parametrize('url_template', [
+    '/',
+    '/category/{post.category.slug}/',
+    '/profile/{post.author.username}/',
+    '/posts/{post.id}/',
+])
+def test_page_queries_use_indexes(
+        user_client, another_user_client, comment_to_a_post,
+        post_with_published_location, url_template
+):
+    url = url_template.format(post=post_with_published_location)
+    for client in (user_client, another_user_client):
+        with CaptureQueriesContext(connection) as captured:
+            client.get(url)
+        for query in captured.captured_queries:
+            sql = query['sql']
+            if not any(table in sql for table in INDEXED_TABLES):
+                continue
+            assert not get_table_scans(sql), (
+                f'Убедитесь, что запрос страницы `{url}` использует индекс,'
+                f' а не полный просмотр таблицы:\n{sql}'
+            )
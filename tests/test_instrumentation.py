@@ -0,0 +1,89 @@
+import re
+from io import StringIO
+
+import pytest
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from blog.instrumentation import percentile, reset_stats
+
+pytestmark = [pytest.mark.django_db]
+
+SERVER_TIMING_RE = re.compile(
+    r'db;dur=[\d.]+;desc="(\d+) queries", tpl;dur=([\d.]+),'
+    r' total;dur=[\d.]+'
+)
+
+
+@pytest.fixture(autouse=True)
+def clean_stats():
+    reset_stats()
+    yield
+    reset_stats()
+
+
+def test_server_timing_header(user_client, post_with_published_location):
+    with CaptureQueriesContext(connection) as captured:
+        response = user_client.get('/')
+    match = SERVER_TIMING_RE.fullmatch(response.get('Server-Timing', ''))
+    assert match, (
+        'Убедитесь, что ответ содержит заголовок Server-Timing со временем'
+        ' базы данных, шаблонов и всего запроса.'
+    )
+    assert int(match[1]) == len(captured.captured_queries), (
+        'Убедитесь, что в Server-Timing передаётся число SQL-запросов.'
+    )
+    assert float(match[2]) > 0
+
+
+def test_stats_command_requires_shared_cache():
+    with pytest.raises(CommandError):
+        call_command('request_stats', stdout=StringIO())
+
+
+def test_stats_command(
+        user_client, post_with_published_location, shared_cache
+):
+    for _ in range(3):
+        user_client.get('/')
+    output = StringIO()
+    call_command('request_stats', stdout=output)
+    lines = [
+        line for line in output.getvalue().splitlines()
+        if line.startswith('blog:index ')
+    ]
+    assert lines, (
+        'Убедитесь, что команда request_stats выводит статистику по'
+        ' представлениям.'
+    )
+    assert lines[0].split()[1] == '3'
+
+    call_command('request_stats', '--reset', stdout=StringIO())
+    output = StringIO()
+    call_command('request_stats', stdout=output)
+    assert 'blog:index' not in output.getvalue()
+
+
+def test_stats_admin_page(client, user_client, django_user_model):
+    user_client.get('/')
+    response = user_client.get('/admin/request-stats/')
+    assert response.status_code == 302, (
+        'Убедитесь, что статистика запросов доступна только персоналу.'
+    )
+    admin = django_user_model.objects.create_superuser(
+        'stats_admin', 'admin@example.com', 'password'
+    )
+    client.force_login(admin)
+    response = client.get('/admin/request-stats/')
+    assert response.status_code == 200
+    assert 'blog:index' in response.content.decode()
+
+
+def test_percentile():
+    values = list(range(1, 101))
+    assert percentile(values, 0.5) == 50
+    assert percentile(values, 0.95) == 95
+    assert percentile(values, 0.99) == 99
+    assert percentile([7], 0.99) == 7
+    assert percentile([], 0.5) is None
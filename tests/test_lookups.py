@@ -0,0 +1,83 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from blog.caching import bump_versions, lookups_scope
+from blog.lookups import category_by_slug, get_lookup_tables
+from blog.models import Category
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.mark.parametrize('url_template', [
+    '/',
+    '/category/{post.category.slug}/',
+    '/profile/{post.author.username}/',
+])
+def test_list_views_skip_category_and_location_joins(
+        client, post_with_published_location, url_template
+):
+    url = url_template.format(post=post_with_published_location)
+    client.get(url)
+    with CaptureQueriesContext(connection) as captured:
+        response = client.get(f'{url}?page=1')
+    assert response.status_code == HTTPStatus.OK
+    post = response.context['page_obj'][0]
+    assert post.category.title and post.location.name
+    joined = [
+        query['sql'] for query in captured.captured_queries
+        if 'JOIN "blog_category"' in query['sql']
+        or 'JOIN "blog_location"' in query['sql']
+    ]
+    assert not joined, (
+        'Убедитесь, что категории и местоположения публикаций в списках'
+        ' берутся из таблиц в памяти, а не присоединяются к запросу.'
+    )
+
+
+def test_tables_reload_only_after_version_bump(published_category):
+    tables = get_lookup_tables()
+    assert get_lookup_tables() is tables
+    assert category_by_slug(published_category.slug) == published_category
+
+    # Версию поднимает другой процесс.
+    bump_versions(lookups_scope())
+    assert get_lookup_tables() is not tables
+
+
+def test_category_changes_reach_views(
+        client, post_with_published_location
+):
+    category = post_with_published_location.category
+    url = f'/category/{category.slug}/'
+    assert client.get(url).status_code == HTTPStatus.OK
+
+    category.title = 'Новое название'
+    category.save()
+    response = client.get(f'{url}?page=1')
+    assert response.context['category'].title == 'Новое название'
+
+    category.is_published = False
+    category.save()
+    assert client.get(f'{url}?page=2').status_code == HTTPStatus.NOT_FOUND
+    assert client.get('/').context['page_obj'].paginator.count == 0
+
+
+def test_tables_expire_without_version_bump(settings, published_category):
+    get_lookup_tables()
+    Category.objects.filter(pk=published_category.pk).update(
+        title='Изменено в другом процессе'
+    )
+    assert category_by_slug(published_category.slug).title != (
+        'Изменено в другом процессе'
+    )
+
+    settings.LOOKUP_TABLES_TIMEOUT = 0
+    assert category_by_slug(published_category.slug).title == (
+        'Изменено в другом процессе'
+    ), (
+        'Убедитесь, что таблицы категорий перечитываются по истечении'
+        ' LOOKUP_TABLES_TIMEOUT, даже если версия в кеше не изменилась.'
+    )
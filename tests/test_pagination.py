@@ -0,0 +1,166 @@
+import base64
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+
+def collect_cursor_pages(client, url):
+    pages = []
+    next_url = f'{url}?after='
+    while next_url:
+        response = client.get(next_url)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Убедитесь, что страница `{next_url}` отображается без ошибок.'
+        )
+        page_obj = response.context['page_obj']
+        pages.append([post.id for post in page_obj])
+        next_url = (
+            f'{url}?after={page_obj.next_cursor}'
+            if page_obj.has_next() else None
+        )
+    return pages
+
+
+@pytest.mark.parametrize('url_template', [
+    '/',
+    '/category/{category.slug}/',
+    '/profile/{user.username}/',
+])
+def test_cursor_pagination_matches_page_mode(
+        user_client, user, published_category,
+        many_posts_with_published_locations, url_template
+):
+    url = url_template.format(category=published_category, user=user)
+    cursor_pages = collect_cursor_pages(user_client, url)
+    page_mode_ids = []
+    for number in range(1, len(cursor_pages) + 1):
+        response = user_client.get(f'{url}?page={number}')
+        page_mode_ids.extend(post.id for post in response.context['page_obj'])
+
+    assert all(len(page) <= N_PER_PAGE for page in cursor_pages), (
+        'Убедитесь, что при постраничном выводе по курсору на странице'
+        f' не больше {N_PER_PAGE} публикаций.'
+    )
+    cursor_ids = [post_id for page in cursor_pages for post_id in page]
+    assert cursor_ids == page_mode_ids, (
+        'Убедитесь, что при постраничном выводе по курсору публикации'
+        ' выводятся в том же порядке и без пропусков, что и с параметром'
+        ' `page`.'
+    )
+    assert len(cursor_ids) == len(many_posts_with_published_locations)
+
+
+@pytest.mark.parametrize('raw', [
+    None,
+    '2020-01-01T00:00:00+00:00,99999999999999999999999',
+    '2020-01-01T00:00:00,1',
+])
+def test_invalid_cursor_returns_first_page(
+        user_client, many_posts_with_published_locations, raw
+):
+    token = (
+        base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+        if raw else 'not-a-cursor'
+    )
+    first_page = user_client.get('/').context['page_obj']
+    response = user_client.get(f'/?after={token}')
+    assert response.status_code == HTTPStatus.OK
+    assert [post.id for post in response.context['page_obj']] == [
+        post.id for post in first_page
+    ]
+
+
+def test_posts_count_is_cached_and_invalidated(
+        user_client, mixer, user, published_category,
+        many_posts_with_published_locations
+):
+    user_client.get('/')
+    with CaptureQueriesContext(connection) as captured:
+        response = user_client.get('/')
+        count = response.context['page_obj'].paginator.count
+    assert not any(
+        'COUNT(' in query['sql'] and 'blog_comment' not in query['sql']
+        for query in captured.captured_queries
+    ), (
+        'Убедитесь, что число публикаций для пагинатора главной страницы'
+        ' берётся из кеша и не пересчитывается на каждый запрос.'
+    )
+
+    mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        is_published=True, pub_date=timezone.now(),
+    )
+    response = user_client.get('/')
+    assert response.context['page_obj'].paginator.count == count + 1, (
+        'Убедитесь, что кешированное число публикаций сбрасывается при'
+        ' создании новой публикации.'
+    )
+
+
+def test_comments_loaded_in_batches(
+        monkeypatch, user_client, mixer, user, post_with_published_location
+):
+    monkeypatch.setattr('blog.views.COMMENTS_PER_PAGE', 2)
+    post = post_with_published_location
+    comments = mixer.cycle(5).blend('blog.Comment', post=post, author=user)
+
+    response = user_client.get(f'/posts/{post.id}/')
+    first_batch = response.context['comments']
+    assert [comment.id for comment in first_batch] == [
+        comment.id for comment in comments[:2]
+    ], (
+        'Убедитесь, что на странице публикации выводится только первая'
+        ' порция комментариев.'
+    )
+
+    loaded_ids = [comment.id for comment in first_batch]
+    next_cursor = first_batch.next_cursor
+    while next_cursor:
+        response = user_client.get(
+            f'/posts/{post.id}/comments/?after={next_cursor}'
+        )
+        assert response.status_code == HTTPStatus.OK
+        batch = response.context['comments']
+        loaded_ids.extend(comment.id for comment in batch)
+        next_cursor = batch.next_cursor
+    assert loaded_ids == [comment.id for comment in comments], (
+        'Убедитесь, что по ссылке «Показать ещё» комментарии подгружаются'
+        ' по порядку и без пропусков.'
+    )
+
+
+def test_estimated_count_keeps_pages_past_the_limit(
+        settings, client, many_posts_with_published_locations
+):
+    settings.POSTS_COUNT_MODE = 'estimated'
+    settings.POSTS_COUNT_ESTIMATE_LIMIT = 3
+    seen = []
+    page = 1
+    while True:
+        response = client.get(f'/?page={page}')
+        assert response.status_code == HTTPStatus.OK
+        page_obj = response.context['page_obj']
+        assert page_obj.number == page, (
+            'Убедитесь, что в режиме оценки числа публикаций страницы за'
+            ' пределом подсчёта остаются доступны.'
+        )
+        assert 'Последняя' not in response.content.decode()
+        seen.extend(post.id for post in page_obj)
+        if not page_obj.has_next():
+            break
+        page += 1
+    assert len(seen) == len(many_posts_with_published_locations)
+
+    response = client.get('/?page=99999')
+    assert response.status_code == HTTPStatus.OK, (
+        'Убедитесь, что страница за концом ленты в режиме оценки не'
+        ' приводит к ошибке.'
+    )
+    assert list(response.context['page_obj'])
@@ -0,0 +1,154 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLResolver, reverse
+
+from blog.urls import urlpatterns as blog_urlpatterns
+from conftest import N_PER_FIXTURE
+from pages.urls import urlpatterns as pages_urlpatterns
+
+pytestmark = [pytest.mark.django_db]
+
+# Сессия, пользователь, дата последнего изменения для ETag, публикация,
+# комментарии и, для автора публикации с ещё не обработанным изображением,
+# статус фоновой задачи.
+DETAIL_PAGE_MAX_QUERIES = 6
+
+
+def count_queries(client, url):
+    with CaptureQueriesContext(connection) as captured:
+        response = client.get(url)
+    assert response.status_code == 200, (
+        f'Убедитесь, что страница `{url}` отображается без ошибок.'
+    )
+    return len(captured.captured_queries)
+
+
+@pytest.mark.parametrize('viewer', ['user_client', 'another_user_client'])
+def test_post_detail_query_count(
+        request, mixer, viewer, user, another_user,
+        post_with_published_location
+):
+    client = request.getfixturevalue(viewer)
+    post = post_with_published_location
+    url = f'/posts/{post.id}/'
+    mixer.blend('blog.Comment', post=post, author=user)
+    few_comments = count_queries(client, url)
+    mixer.cycle(10).blend(
+        'blog.Comment', post=post, author=mixer.sequence(user, another_user)
+    )
+    many_comments = count_queries(client, url)
+    assert few_comments == many_comments, (
+        'Убедитесь, что число запросов к базе данных на странице публикации'
+        ' не зависит от числа комментариев.'
+    )
+    assert many_comments <= DETAIL_PAGE_MAX_QUERIES, (
+        'Убедитесь, что публикация загружается одним запросом вместе с'
+        ' категорией, автором и местоположением, а комментарии — одним'
+        ' запросом вместе с авторами.'
+    )
+
+
+def iter_routes(patterns, namespace):
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            yield from iter_routes(pattern.url_patterns, namespace)
+        else:
+            yield (
+                f'{namespace}:{pattern.name}',
+                tuple(pattern.pattern.converters),
+            )
+
+
+ROUTES = [
+    *iter_routes(blog_urlpatterns, 'blog'),
+    *iter_routes(pages_urlpatterns, 'pages'),
+]
+
+
+# Слово из заголовков добавленных публикаций: по нему ищет страница поиска.
+SEARCH_TERM = 'прогулка'
+
+# Ответы на GET, отличные от 200 OK. Автор публикации и комментария — user.
+STATUSES = {
+    'blog:add_comment': HTTPStatus.FOUND,
+}
+NOT_AUTHOR_STATUSES = {
+    'blog:edit_post': HTTPStatus.FOUND,
+    'blog:delete_post': HTTPStatus.FOUND,
+    'blog:edit_comment': HTTPStatus.FOUND,
+    'blog:delete_comment': HTTPStatus.NOT_FOUND,
+}
+
+
+def expected_status(route_name, viewer):
+    if viewer == 'another_user_client' and route_name in NOT_AUTHOR_STATUSES:
+        return NOT_AUTHOR_STATUSES[route_name]
+    return STATUSES.get(route_name, HTTPStatus.OK)
+
+
+def seed(mixer, user, another_user, post, count):
+    mixer.cycle(count).blend(
+        'blog.Post',
+        title=f'Долгая {SEARCH_TERM} по лесу',
+        author=mixer.sequence(user, another_user),
+        category=post.category,
+        location=post.location,
+        is_published=True,
+        pub_date=post.pub_date,
+    )
+    mixer.cycle(count).blend(
+        'blog.Comment', post=post, author=mixer.sequence(user, another_user)
+    )
+
+
+def count_uncached_queries(client, url, status):
+    cache.clear()
+    with CaptureQueriesContext(connection) as captured:
+        response = client.get(url)
+    assert response.status_code == status, (
+        f'Убедитесь, что страница `{url}` отвечает кодом {status.value}.'
+    )
+    if response.context and 'page_obj' in response.context:
+        assert response.context['page_obj'], (
+            f'Убедитесь, что на странице `{url}` выводятся публикации.'
+        )
+    return len(captured.captured_queries)
+
+
+@pytest.mark.parametrize('viewer', ['user_client', 'another_user_client'])
+@pytest.mark.parametrize(
+    'route_name, params', ROUTES, ids=[name for name, _ in ROUTES]
+)
+def test_query_count_does_not_grow_with_data(
+        request, mixer, viewer, user, another_user,
+        post_with_published_location, route_name, params
+):
+    client = request.getfixturevalue(viewer)
+    post = post_with_published_location
+    comment = mixer.blend('blog.Comment', post=post, author=user)
+    values = {
+        'pk': post.pk,
+        'post_id': post.pk,
+        'comment_id': comment.pk,
+        'username': user.username,
+        'category_slug': post.category.slug,
+    }
+    url = reverse(route_name, kwargs={name: values[name] for name in params})
+    if route_name == 'blog:search':
+        url = f'{url}?q={SEARCH_TERM}'
+    status = expected_status(route_name, viewer)
+
+    seed(mixer, user, another_user, post, N_PER_FIXTURE)
+    few = count_uncached_queries(client, url, status)
+    seed(mixer, user, another_user, post, 9 * N_PER_FIXTURE)
+    many = count_uncached_queries(client, url, status)
+    assert few == many, (
+        f'Убедитесь, что число запросов к базе данных на странице `{url}`'
+        f' не растёт вместе с числом публикаций и комментариев:'
+        f' {few} запросов при {N_PER_FIXTURE} и {many} при'
+        f' {10 * N_PER_FIXTURE}.'
+    )
@@ -0,0 +1,71 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.http import HttpResponse
+from django.test import RequestFactory
+
+from blog.middleware import ReplicaStickinessMiddleware
+from blog.models import Comment, Post
+from blog.routers import ReadReplicaRouter, pinned_to_primary
+
+
+def test_reads_go_to_replica_and_writes_to_primary(settings):
+    settings.READ_REPLICA_ALIAS = 'replica'
+    router = ReadReplicaRouter()
+    for model in (Post, Comment):
+        with pinned_to_primary(False):
+            assert router.db_for_read(model) == 'replica', (
+                'Убедитесь, что чтение моделей блога направляется на'
+                ' реплику.'
+            )
+        assert router.db_for_write(model) == 'default', (
+            'Убедитесь, что запись моделей блога идёт в основную базу.'
+        )
+    assert router.db_for_read(get_user_model()) is None
+    with pinned_to_primary():
+        assert router.db_for_read(Post) is None
+
+
+def test_reads_outside_requests_go_to_primary(settings):
+    settings.READ_REPLICA_ALIAS = 'replica'
+    assert ReadReplicaRouter().db_for_read(Post) is None, (
+        'Убедитесь, что команды manage.py, которые пишут по прочитанному,'
+        ' читают из основной базы, а не с реплики.'
+    )
+
+
+def test_replica_disabled_by_default(settings):
+    settings.READ_REPLICA_ALIAS = None
+    assert ReadReplicaRouter().db_for_read(Post) is None
+
+
+@pytest.mark.django_db
+def test_author_reads_primary_after_write(settings, user):
+    settings.READ_REPLICA_ALIAS = 'replica'
+    router = ReadReplicaRouter()
+    seen = []
+
+    def get_response(request):
+        seen.append(router.db_for_read(Post))
+        return HttpResponse()
+
+    middleware = ReplicaStickinessMiddleware(get_response)
+    factory = RequestFactory()
+
+    request = factory.post('/posts/1/comment/')
+    request.user = user
+    response = middleware(request)
+    cookie = response.cookies[ReplicaStickinessMiddleware.cookie_name]
+
+    request = factory.get('/posts/1/')
+    request.user = user
+    request.COOKIES[cookie.key] = cookie.value
+    middleware(request)
+
+    request = factory.get('/posts/1/')
+    request.user = user
+    middleware(request)
+
+    assert seen == [None, None, 'replica'], (
+        'Убедитесь, что запросы на запись и чтения автора сразу после записи'
+        ' идут в основную базу, а остальные чтения — на реплику.'
+    )
@@ -0,0 +1,141 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import CommandError, call_command
+from django.utils import timezone
+
+from blog import caching
+from blog.models import (AuthorStats, FeedEntry, Post,
+                         ScheduledPublication)
+from blog.scheduler import post_published, publish_due
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def scheduled_post(mixer, user, published_category):
+    return mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        is_published=True, pub_date=timezone.now() + timedelta(hours=1),
+    )
+
+
+def go_live(post):
+    """Переносит pub_date в прошлое, как будто наступило время выхода."""
+    past = timezone.now() - timedelta(seconds=1)
+    for model in (Post, FeedEntry):
+        model.objects.filter(pk=post.pk).update(pub_date=past)
+    ScheduledPublication.objects.filter(post=post).update(pub_date=past)
+
+
+def test_schedule_follows_post_changes(scheduled_post):
+    assert ScheduledPublication.objects.get(
+        post=scheduled_post
+    ).pub_date == scheduled_post.pub_date
+
+    scheduled_post.is_published = False
+    scheduled_post.save()
+    assert not ScheduledPublication.objects.exists(), (
+        'Убедитесь, что снятая с публикации запись убирается из расписания.'
+    )
+
+    scheduled_post.is_published = True
+    scheduled_post.pub_date = timezone.now() - timedelta(hours=1)
+    scheduled_post.save()
+    assert not ScheduledPublication.objects.exists()
+
+
+def test_post_published_is_sent_once(scheduled_post):
+    received = []
+
+    def receiver(sender, post, **kwargs):
+        received.append(post.pk)
+
+    post_published.connect(receiver)
+    try:
+        assert publish_due() == 0
+        go_live(scheduled_post)
+        assert publish_due() == 1
+        assert publish_due() == 0
+    finally:
+        post_published.disconnect(receiver)
+    assert received == [scheduled_post.pk], (
+        'Убедитесь, что событие выхода публикации отправляется ровно один раз.'
+    )
+
+
+def test_failed_delivery_keeps_post_scheduled(scheduled_post):
+    received = []
+
+    def receiver(sender, post, **kwargs):
+        if not received:
+            received.append(None)
+            raise RuntimeError('Получатель недоступен')
+        received.append(post.pk)
+
+    go_live(scheduled_post)
+    post_published.connect(receiver)
+    try:
+        assert publish_due() == 0
+        assert ScheduledPublication.objects.filter(
+            post=scheduled_post
+        ).exists(), (
+            'Убедитесь, что при ошибке получателя post_published публикация'
+            ' остаётся в расписании.'
+        )
+        assert publish_due() == 1
+        assert publish_due() == 0
+    finally:
+        post_published.disconnect(receiver)
+    assert received == [None, scheduled_post.pk]
+
+
+def test_scheduler_requires_shared_cache(
+        settings, monkeypatch, scheduled_post
+):
+    settings.PUBLICATION_SCHEDULER = True
+    with pytest.raises(CommandError):
+        call_command('run_scheduler', '--once', stdout=StringIO())
+
+    Post.objects.update(pub_date=timezone.now() + timedelta(minutes=1))
+    assert caching.page_cache_timeout(Post.objects.all()) <= 60, (
+        'Убедитесь, что без общего кеша срок кеша страниц по-прежнему'
+        ' ограничивается ближайшей отложенной публикацией.'
+    )
+    monkeypatch.setattr(caching, 'cache_is_shared', lambda: True)
+    assert caching.page_cache_timeout(
+        Post.objects.all()
+    ) == settings.PAGE_CACHE_TIMEOUT
+
+
+def test_scheduler_invalidates_cached_pages(
+        settings, client, user, scheduled_post, shared_cache
+):
+    settings.PUBLICATION_SCHEDULER = True
+    client.get(f'/profile/{user.username}/')
+    assert client.get('/').context['page_obj'].paginator.count == 0
+
+    go_live(scheduled_post)
+    response = client.get('/')
+    assert response.context is None, (
+        'Убедитесь, что до запуска планировщика лента отдаётся из кеша.'
+    )
+
+    call_command('run_scheduler', '--once', stdout=StringIO())
+    response = client.get('/')
+    assert [post.pk for post in response.context['page_obj']] == [
+        scheduled_post.pk
+    ], (
+        'Убедитесь, что после выхода отложенной публикации кеш ленты'
+        ' сбрасывается.'
+    )
+    assert AuthorStats.objects.get(author=user).published_posts == 1
+
+
+def test_rebuild_restores_schedule(scheduled_post, shared_cache):
+    ScheduledPublication.objects.all().delete()
+    out = StringIO()
+    call_command('run_scheduler', '--rebuild', '--once', stdout=out)
+    assert 'Отложенных публикаций: 1' in out.getvalue()
+    assert ScheduledPublication.objects.filter(post=scheduled_post).exists()
@@ -0,0 +1,187 @@
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection, connections, router
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from blog.models import Comment, Post, SearchTerm
+from blog.search import FTS_TABLE, rebuild_index, search_post_ids, use_fts5
+from blog.stemming import stem, terms
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(params=['fts5', 'postings'])
+def search_backend(request, settings):
+    settings.SEARCH_BACKEND = request.param
+    return request.param
+
+
+def found_ids(client, query):
+    response = client.get('/search/', {'q': query})
+    assert response.status_code == HTTPStatus.OK
+    return [post.id for post in response.context['page_obj']]
+
+
+@pytest.mark.parametrize('forms', [
+    ('публикация', 'публикации', 'публикаций', 'публикацию'),
+    ('красивый', 'красивая', 'красивые', 'красивого'),
+    ('ёлка', 'елки', 'ёлкой'),
+])
+def test_word_forms_share_stem(forms):
+    assert len({stem(word) for word in forms}) == 1, (
+        'Убедитесь, что разные формы одного слова приводятся к одной основе.'
+    )
+
+
+def test_terms_skip_stop_words():
+    assert terms('Кот и собака на Django') == [
+        stem('кот'), stem('собака'), 'django'
+    ]
+
+
+def test_search_finds_word_forms_and_ranks_title_first(
+        search_backend, client, make_post
+):
+    in_text = make_post(title='Заметка', text='Прогулка по зимнему лесу')
+    in_title = make_post(title='Зимние прогулки', text='Заметка')
+    make_post(title='Другое', text='Ничего общего')
+    assert found_ids(client, 'прогулками') == [in_title.id, in_text.id], (
+        'Убедитесь, что поиск находит разные формы слова и выше ставит'
+        ' совпадения в заголовке.'
+    )
+    assert found_ids(client, 'зимняя прогулка') == [in_title.id, in_text.id]
+    assert found_ids(client, 'прогулка летом') == [], (
+        'Убедитесь, что найденные публикации содержат все слова запроса.'
+    )
+
+
+def test_search_hides_unpublished(search_backend, client, make_post):
+    make_post(title='Тайная встреча', is_published=False)
+    make_post(
+        title='Будущая встреча',
+        pub_date=timezone.now() + timezone.timedelta(days=1),
+    )
+    visible = make_post(title='Открытая встреча')
+    assert found_ids(client, 'встреча') == [visible.id]
+
+
+def test_index_follows_changes(
+        search_backend, client, mixer, user, make_post
+):
+    post = make_post(title='Старый заголовок')
+    post.title = 'Новый заголовок'
+    post.save()
+    assert found_ids(client, 'старый') == []
+    assert found_ids(client, 'новый') == [post.id], (
+        'Убедитесь, что поисковый индекс обновляется при изменении'
+        ' публикации.'
+    )
+
+    comment = mixer.blend(
+        'blog.Comment', post=post, author=user, text='Отличная фотография'
+    )
+    assert found_ids(client, 'фотографии') == [post.id], (
+        'Убедитесь, что поиск учитывает комментарии к публикации.'
+    )
+    comment.delete()
+    assert found_ids(client, 'фотографии') == []
+
+    mixer.blend('blog.Comment', post=post, author=user, text='Фотография')
+    post_id = post.id
+    post.delete()
+    assert search_post_ids('заголовок') == []
+    assert search_post_ids('фотография') == [], (
+        f'Убедитесь, что удалённая публикация {post_id} пропадает из индекса.'
+    )
+
+
+def test_rebuild_command(search_backend, make_post):
+    post = make_post(title='Перестроенный индекс')
+    call_command('rebuild_search_index', stdout=StringIO())
+    assert search_post_ids('индексы') == [post.id]
+
+
+def test_admin_search_uses_index(
+        search_backend, client, django_user_model, make_post
+):
+    post = make_post(title='Морская прогулка')
+    make_post(title='Горный поход')
+    admin = django_user_model.objects.create_superuser(
+        'search_admin', 'admin@example.com', 'password'
+    )
+    client.force_login(admin)
+    response = client.get('/admin/blog/post/', {'q': 'прогулки'})
+    assert response.status_code == HTTPStatus.OK
+    assert [
+        obj.id for obj in response.context['cl'].result_list
+    ] == [post.id], (
+        'Убедитесь, что поиск в админке использует поисковый индекс.'
+    )
+
+
+def test_admin_search_is_not_capped(
+        search_backend, client, settings, django_user_model, make_post
+):
+    settings.SEARCH_MAX_RESULTS = 1
+    posts = [make_post(title='Морская прогулка') for _ in range(3)]
+    assert len(search_post_ids('прогулки')) == 1
+    admin = django_user_model.objects.create_superuser(
+        'search_admin', 'admin@example.com', 'password'
+    )
+    client.force_login(admin)
+    response = client.get('/admin/blog/post/', {'q': 'прогулки'})
+    assert {obj.id for obj in response.context['cl'].result_list} == {
+        post.id for post in posts
+    }, (
+        'Убедитесь, что поиск в админке не ограничен SEARCH_MAX_RESULTS.'
+    )
+
+
+def search_index():
+    using = router.db_for_read(Post)
+    if use_fts5(using):
+        with connections[using].cursor() as cursor:
+            cursor.execute(
+                f'SELECT rowid, title, text, comments FROM {FTS_TABLE}'
+            )
+            return {
+                row[0]: [sorted(column.split()) for column in row[1:]]
+                for row in cursor.fetchall()
+            }
+    return set(SearchTerm.objects.values_list('post_id', 'term', 'weight'))
+
+
+def test_comment_changes_are_indexed_incrementally(
+        search_backend, client, user_client, make_post
+):
+    post = make_post(title='Прогулка')
+    url = f'/posts/{post.id}/comment/'
+    user_client.post(url, data={'text': 'Старая фотография'})
+    with CaptureQueriesContext(connection) as captured:
+        user_client.post(url, data={'text': 'Новая фотография и лес'})
+    assert not [
+        query['sql'] for query in captured.captured_queries
+        if 'FROM "blog_comment"' in query['sql']
+    ], (
+        'Убедитесь, что при добавлении комментария поисковый индекс не'
+        ' перечитывает остальные комментарии публикации.'
+    )
+    comment = Comment.objects.get(text='Старая фотография')
+    user_client.post(
+        f'/posts/{post.id}/edit_comment/{comment.id}/',
+        data={'text': 'Летний лес'},
+    )
+    Comment.objects.get(text__startswith='Новая').delete()
+    assert found_ids(client, 'фотография') == []
+    assert found_ids(client, 'лесом') == [post.id]
+
+    index = search_index()
+    rebuild_index()
+    assert search_index() == index, (
+        'Убедитесь, что инкрементальное обновление индекса по комментариям'
+        ' даёт тот же результат, что и полная перестройка.'
+    )
@@ -0,0 +1,79 @@
+import gzip
+
+import pytest
+from django.core.management import call_command
+from django.test import RequestFactory
+
+from blog.serving import serve_file
+
+CONTENT = b'body { color: red; }\n' * 100
+
+
+@pytest.fixture
+def document_root(tmp_path):
+    (tmp_path / 'style.css').write_bytes(CONTENT)
+    return tmp_path
+
+
+def get(path, document_root, **headers):
+    request = RequestFactory().get(f'/static/{path}', **headers)
+    return serve_file(
+        request, path, str(document_root), max_age=100, immutable=True
+    )
+
+
+def body(response):
+    return b''.join(response.streaming_content)
+
+
+def test_validators_and_not_modified(document_root):
+    response = get('style.css', document_root)
+    assert response.status_code == 200
+    assert body(response) == CONTENT
+    assert response['Cache-Control'] == 'public, max-age=100, immutable'
+    assert response['Last-Modified']
+    not_modified = get(
+        'style.css', document_root, HTTP_IF_NONE_MATCH=response['ETag']
+    )
+    assert not_modified.status_code == 304, (
+        'Убедитесь, что на запрос с совпадающим If-None-Match отдаётся'
+        ' ответ 304 Not Modified.'
+    )
+
+
+def test_range_request(document_root):
+    response = get('style.css', document_root, HTTP_RANGE='bytes=10-19')
+    assert response.status_code == 206
+    assert body(response) == CONTENT[10:20]
+    assert response['Content-Range'] == f'bytes 10-19/{len(CONTENT)}'
+    suffix = get('style.css', document_root, HTTP_RANGE='bytes=-5')
+    assert body(suffix) == CONTENT[-5:]
+    invalid = get('style.css', document_root, HTTP_RANGE='bytes=99999-')
+    assert invalid.status_code == 416
+
+
+def test_precompressed_variant(document_root):
+    (document_root / 'style.css.gz').write_bytes(gzip.compress(CONTENT))
+    response = get('style.css', document_root, HTTP_ACCEPT_ENCODING='gzip')
+    assert response['Content-Encoding'] == 'gzip'
+    assert response['Content-Type'].startswith('text/css')
+    assert gzip.decompress(body(response)) == CONTENT
+    assert 'Accept-Encoding' in response['Vary']
+
+
+def test_collectstatic_hashes_and_compresses(settings, tmp_path):
+    settings.STATIC_ROOT = tmp_path
+    settings.STATICFILES_STORAGE = (
+        'blog.storage.CompressedManifestStaticFilesStorage'
+    )
+    call_command('collectstatic', interactive=False, verbosity=0)
+    hashed_css = [
+        path for path in (tmp_path / 'css').iterdir()
+        if path.name.startswith('bootstrap.min.')
+        and path.name.endswith('.css')
+    ]
+    hashed_css.remove(tmp_path / 'css' / 'bootstrap.min.css')
+    assert hashed_css, 'Убедитесь, что статика собирается с хешем в имени.'
+    assert hashed_css[0].with_name(hashed_css[0].name + '.gz').exists(), (
+        'Убедитесь, что при сборке статики создаются сжатые копии .gz.'
+    )
@@ -0,0 +1,84 @@
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+
+import pytest
+from django.conf import settings
+from django.db import connection, connections
+from django.test import Client
+
+from blog.models import Comment
+from blog.signals import apply_sqlite_pragmas
+
+WRITERS = 4
+COMMENTS_PER_WRITER = 10
+FEED_READS = 20
+
+pytestmark = [
+    pytest.mark.skipif(
+        connection.vendor != 'sqlite', reason='профиль только для SQLite'
+    ),
+]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_production_profile_pragmas(settings):
+    settings.SQLITE_PRAGMAS = settings.SQLITE_PROFILES['production']
+    apply_sqlite_pragmas(sender=None, connection=connection)
+    with connection.cursor() as cursor:
+        cursor.execute('PRAGMA synchronous')
+        assert cursor.fetchone()[0] == 1, (
+            'Убедитесь, что профиль production включает synchronous=NORMAL.'
+        )
+        cursor.execute('PRAGMA busy_timeout')
+        assert cursor.fetchone()[0] == (
+            settings.SQLITE_PROFILES['production']['busy_timeout']
+        )
+
+
+@pytest.mark.skipif(
+    not settings.DATABASES['default'].get('TEST', {}).get('NAME'),
+    reason=(
+        'параллельная запись проверяется на файловой базе:'
+        ' запустите тесты с BLOGICUM_SQLITE_PROFILE=production'
+    ),
+)
+@pytest.mark.django_db(transaction=True)
+def test_concurrent_comment_writers_and_feed_reader(
+        user, post_with_published_location
+):
+    post = post_with_published_location
+
+    def write_comments(writer):
+        client = Client()
+        client.force_login(user)
+        try:
+            for number in range(COMMENTS_PER_WRITER):
+                response = client.post(
+                    f'/posts/{post.id}/comment/',
+                    data={'text': f'Комментарий {writer}-{number}'},
+                )
+                assert response.status_code == HTTPStatus.FOUND
+        finally:
+            connections.close_all()
+
+    def read_feed():
+        client = Client()
+        try:
+            for _ in range(FEED_READS):
+                assert client.get('/').status_code == HTTPStatus.OK
+        finally:
+            connections.close_all()
+
+    with ThreadPoolExecutor(max_workers=WRITERS + 1) as executor:
+        futures = [executor.submit(write_comments, n) for n in range(WRITERS)]
+        futures.append(executor.submit(read_feed))
+        for future in futures:
+            future.result()
+
+    expected = WRITERS * COMMENTS_PER_WRITER
+    post.refresh_from_db()
+    assert Comment.objects.filter(post=post).count() == expected
+    assert post.comment_count == expected, (
+        'Убедитесь, что при параллельной записи комментариев счётчик'
+        ' `comment_count` не теряет обновлений.'
+    )
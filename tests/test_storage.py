@@ -0,0 +1,96 @@
+import os
+import time
+from io import BytesIO
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import transaction
+from PIL import Image
+
+from blog.images import build_variants, variant_name
+from blog.storage import post_image_storage
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    return tmp_path
+
+
+def image_upload(color='red'):
+    buffer = BytesIO()
+    Image.new('RGB', (50, 50), color=color).save(buffer, 'PNG')
+    return SimpleUploadedFile('photo.png', buffer.getvalue())
+
+
+def test_identical_uploads_deduplicated_and_refcounted(
+        make_post, django_capture_on_commit_callbacks
+):
+    first = make_post(image=image_upload())
+    second = make_post(image=image_upload())
+    assert first.image.name == second.image.name, (
+        'Убедитесь, что одинаковые изображения сохраняются в один файл.'
+    )
+    name = first.image.name
+    build_variants(first.image)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        first.delete()
+    assert post_image_storage.exists(name), (
+        'Убедитесь, что файл не удаляется, пока на него ссылается другая'
+        ' публикация.'
+    )
+    with django_capture_on_commit_callbacks(execute=True):
+        second.delete()
+    assert not post_image_storage.exists(name), (
+        'Убедитесь, что файл удаляется вместе с последней публикацией,'
+        ' которая на него ссылается.'
+    )
+    assert not post_image_storage.exists(variant_name(name, 'card'))
+
+
+def test_replaced_image_reclaimed(
+        make_post, django_capture_on_commit_callbacks
+):
+    post = make_post(image=image_upload('red'))
+    old_name = post.image.name
+    post.image = image_upload('blue')
+    with django_capture_on_commit_callbacks(execute=True):
+        post.save()
+    assert post.image.name != old_name
+    assert not post_image_storage.exists(old_name), (
+        'Убедитесь, что при замене изображения старый файл удаляется,'
+        ' если на него больше никто не ссылается.'
+    )
+
+
+def test_rolled_back_delete_keeps_image(
+        make_post, django_capture_on_commit_callbacks
+):
+    post = make_post(image=image_upload())
+    with django_capture_on_commit_callbacks(execute=True):
+        with pytest.raises(RuntimeError), transaction.atomic():
+            post.delete()
+            raise RuntimeError
+    assert post_image_storage.exists(post.image.name), (
+        'Убедитесь, что файл изображения удаляется только после фиксации'
+        ' транзакции, в которой удалена публикация.'
+    )
+
+
+def test_collect_media_garbage(make_post, media_root):
+    post = make_post(image=image_upload())
+    orphan = media_root / 'posts_images' / 'orphan.png'
+    orphan.write_bytes(b'orphan')
+    old = time.time() - 2 * 60 * 60
+    os.utime(orphan, (old, old))
+
+    call_command('collect_media_garbage')
+    assert not orphan.exists(), (
+        'Убедитесь, что команда collect_media_garbage удаляет файлы без'
+        ' ссылок.'
+    )
+    assert post_image_storage.exists(post.image.name)
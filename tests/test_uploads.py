@@ -0,0 +1,74 @@
+import os
+from io import BytesIO
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import RequestFactory
+from django.utils import timezone
+from PIL import Image
+
+from blog.models import Post
+from blog.uploadhandlers import SizeLimitedUploadHandler
+
+pytestmark = [pytest.mark.django_db]
+
+
+def make_upload(image_format='PNG', size=(200, 200), name='photo.png'):
+    buffer = BytesIO()
+    image = Image.frombytes('RGB', size, os.urandom(size[0] * size[1] * 3))
+    image.save(buffer, image_format)
+    return SimpleUploadedFile(name, buffer.getvalue())
+
+
+def post_with_image(client, category, image):
+    return client.post('/posts/create/', data={
+        'title': 'Загрузка',
+        'text': 'Текст',
+        'is_published': True,
+        'pub_date': timezone.localtime().strftime('%Y-%m-%d %H:%M'),
+        'category': category.id,
+        'image': image,
+    })
+
+
+@pytest.mark.parametrize('override, upload', [
+    ({'MAX_UPLOAD_SIZE': 1024}, make_upload()),
+    ({'MAX_IMAGE_PIXELS': 100}, make_upload()),
+    ({}, make_upload('BMP', name='photo.bmp')),
+    ({}, SimpleUploadedFile('photo.png', b'not an image')),
+])
+def test_bad_uploads_rejected(
+        settings, user_client, published_category, override, upload
+):
+    for name, value in override.items():
+        setattr(settings, name, value)
+    response = post_with_image(user_client, published_category, upload)
+    assert response.status_code == 200
+    assert response.context['form'].errors.get('image'), (
+        'Убедитесь, что слишком большие файлы, изображения неподдерживаемых'
+        ' форматов и не изображения отклоняются формой публикации.'
+    )
+    assert not Post.objects.exists()
+
+
+def test_valid_upload_accepted(user_client, published_category):
+    response = post_with_image(
+        user_client, published_category, make_upload('JPEG', name='a.jpg')
+    )
+    assert response.status_code == 302
+    assert Post.objects.get().image
+
+
+def test_handler_stops_storing_after_limit(settings):
+    settings.MAX_UPLOAD_SIZE = 100
+    handler = SizeLimitedUploadHandler(RequestFactory().post('/'))
+    handler.new_file('image', 'big.png', 'image/png', None)
+    for start in range(0, 1000, 50):
+        handler.receive_data_chunk(b'x' * 50, start)
+    upload = handler.file_complete(1000)
+    assert upload.size == 1000
+    assert os.path.getsize(upload.temporary_file_path()) <= 100, (
+        'Убедитесь, что обработчик загрузки не сохраняет на диск данные'
+        ' сверх MAX_UPLOAD_SIZE.'
+    )
+    upload.close()